@@ -0,0 +1,180 @@
+from collections import namedtuple
+from zlib import crc32
+
+import numpy
+
+Distribution = namedtuple('Distribution', ['counts', 'shares', 'max_skew'])
+Churn = namedtuple('Churn', ['moved', 'fraction'])
+
+UNASSIGNED = -1
+
+
+def hash_keys(values):
+    """
+        Hashes hash_on values (consumer ids, ips, header values...) the way
+        Kong does, with crc32, into an array to map in one go.
+    """
+    values = [value if isinstance(value, bytes) else str(value).encode('utf-8')
+              for value in values]
+    return numpy.fromiter((crc32(value) for value in values), dtype=numpy.uint32,
+                          count=len(values))
+
+
+def synthetic_keys(count, seed=0):
+    """
+        Uniformly distributed hashes, standing in for count distinct keys.
+    """
+    return numpy.random.RandomState(seed).randint(0, 2 ** 32, size=count, dtype=numpy.uint32)
+
+
+def _quotas(weights, slots):
+    total = weights.sum()
+    if not total:
+        return numpy.zeros(len(weights), dtype=numpy.int64)
+
+    exact = weights * slots / total
+    quotas = numpy.floor(exact).astype(numpy.int64)
+    # largest remainders take the slots left over
+    leftover = slots - quotas.sum()
+    quotas[numpy.argsort(quotas - exact, kind='stable')[:leftover]] += 1
+    return quotas
+
+
+class Ring:
+    """
+        Offline model of an upstream's consistent-hashing ring: slots are
+        dealt to targets in proportion to their weights following a fixed
+        pseudo-random slot order, and a key goes to the target owning slot
+        hash % slots.
+
+        Like Kong, a change of targets only moves the slots it has to:
+        targets above their new quota release their most recently dealt
+        slots, which go to the targets below theirs.
+    """
+
+    def __init__(self, targets=(), slots=10000, seed=0):
+        self.slots = slots
+        self.seed = seed
+        self.names = []
+        self.weights = numpy.zeros(0, dtype=numpy.int64)
+        self.owners = numpy.full(slots, UNASSIGNED, dtype=numpy.int64)
+        self._order = numpy.random.RandomState(seed).permutation(slots)
+
+        self._set_weights(dict(targets))
+
+    @classmethod
+    def from_kong(cls, kong_client, upstream_name_or_id, size=1000, seed=0):
+        """
+            Builds the ring of an upstream from its slots and the latest
+            entry of each of its targets.
+        """
+        upstream = kong_client.upstreams.retrieve(upstream_name_or_id)
+        latest = {}
+        for target in kong_client.targets.list_all(upstream_name_or_id, size):
+            target = target.as_dict()
+            known = latest.get(target['target'])
+            if known is None or target.get('created_at', 0) >= known.get('created_at', 0):
+                latest[target['target']] = target
+
+        return cls([(name, target.get('weight', 100)) for name, target in latest.items()],
+                   slots=getattr(upstream, 'slots', 10000), seed=seed)
+
+    def _copy(self):
+        ring = Ring.__new__(Ring)
+        ring.slots = self.slots
+        ring.seed = self.seed
+        ring.names = list(self.names)
+        ring.weights = self.weights.copy()
+        ring.owners = self.owners.copy()
+        ring._order = self._order
+        return ring
+
+    def _set_weights(self, targets):
+        for name in targets:
+            if name not in self.names:
+                self.names.append(name)
+        weights = numpy.zeros(len(self.names), dtype=numpy.int64)
+        weights[:len(self.weights)] = self.weights
+        for name, weight in targets.items():
+            if weight < 0:
+                raise ValueError('weight of %s must not be negative' % name)
+            weights[self.names.index(name)] = weight
+        self.weights = weights
+
+        quotas = _quotas(weights, self.slots)
+        dealt = self.owners[self._order]
+        counts = numpy.bincount(dealt[dealt != UNASSIGNED], minlength=len(self.names))
+
+        for index in numpy.nonzero(counts > quotas)[0]:
+            positions = numpy.nonzero(dealt == index)[0]
+            dealt[positions[quotas[index]:]] = UNASSIGNED
+            counts[index] = quotas[index]
+
+        free = numpy.nonzero(dealt == UNASSIGNED)[0]
+        deficits = numpy.maximum(quotas - counts, 0)
+        takers = numpy.repeat(numpy.arange(len(self.names)), deficits)
+        dealt[free[:len(takers)]] = takers
+
+        self.owners[self._order] = dealt
+
+    def with_targets(self, targets):
+        """
+            Returns the ring after setting the weights of some targets,
+            adding the unknown ones. A weight of 0 removes a target.
+        """
+        ring = self._copy()
+        ring._set_weights(dict(targets))
+        return ring
+
+    def with_target(self, name, weight=100):
+        return self.with_targets({name: weight})
+
+    def without_target(self, name):
+        return self.with_targets({name: 0})
+
+    @property
+    def targets(self):
+        return {name: int(weight) for name, weight in zip(self.names, self.weights) if weight}
+
+    def map(self, hashes):
+        """
+            Indexes in names of the targets of an array of hashes.
+        """
+        return self.owners[numpy.asarray(hashes, dtype=numpy.uint32) % self.slots]
+
+    def lookup(self, value):
+        """
+            Target a hash_on value goes to, None when no target is left.
+        """
+        owner = self.owners[crc32(str(value).encode('utf-8')) % self.slots]
+        return self.names[owner] if owner != UNASSIGNED else None
+
+    def distribution(self, hashes):
+        """
+            Keys per target, their share of the keys, and the largest
+            ratio between a target's share and its weight's share.
+        """
+        active = self.weights > 0
+        if not active.any():
+            return Distribution({}, {}, 0.)
+
+        counts = numpy.bincount(self.map(hashes), minlength=len(self.names))
+        total = max(len(hashes), 1)
+        expected = self.weights / self.weights.sum()
+        skew = (counts[active] / total / expected[active]).max()
+
+        names = [(index, name) for index, name in enumerate(self.names) if active[index]]
+        return Distribution({name: int(counts[index]) for index, name in names},
+                            {name: float(counts[index] / total) for index, name in names},
+                            float(skew))
+
+    def churn(self, other, hashes):
+        """
+            Number and fraction of keys whose target differs in the other
+            ring, e.g. one returned by with_target().
+        """
+        translate = numpy.array([other.names.index(name) if name in other.names else UNASSIGNED
+                                 for name in self.names] + [UNASSIGNED], dtype=numpy.int64)
+        hashes = numpy.asarray(hashes, dtype=numpy.uint32)
+        moved = int(numpy.count_nonzero(translate[self.map(hashes)] != other.map(hashes)))
+        return Churn(moved, moved / max(len(hashes), 1))
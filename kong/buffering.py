@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class _PendingUpdate:  # pylint: disable=too-few-public-methods
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.kwargs = {}
+        self.future = Future()
+
+
+def merge_update(kwargs, update):
+    """
+        Later values win; dicts such as a plugin config are merged one
+        level deep so that earlier keys survive.
+    """
+    for key, value in update.items():
+        previous = kwargs.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            kwargs[key] = dict(previous, **value)
+        else:
+            kwargs[key] = value
+
+
+class WriteBehindBuffer:  # pylint: disable=too-many-instance-attributes
+    """
+        Holds the updates of a client for window seconds from the first
+        update of each pk_or_id, merging any later ones, then sends them
+        as a single update. Every call returns the Future of the update it
+        was merged into.
+    """
+
+    def __init__(self, client, window=1.0):
+        self._client = client
+        self.window = window
+        self.merged = 0
+        self.sent = 0
+        self._condition = threading.Condition()
+        self._sending = threading.Lock()
+        self._pending = OrderedDict()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def update(self, pk_or_id, **kwargs):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('write-behind buffer is closed')
+
+            pending = self._pending.get(pk_or_id)
+            if pending is None:
+                pending = self._pending[pk_or_id] = _PendingUpdate(time.monotonic() + self.window)
+                self._condition.notify()
+            else:
+                self.merged += 1
+
+            merge_update(pending.kwargs, kwargs)
+            return pending.future
+
+    def flush(self):
+        """
+            Sends every pending update now and waits for them.
+        """
+        with self._condition:
+            due = list(self._pending.items())
+            self._pending.clear()
+        self._send(due)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        return
+                    due = self._pop_due(time.monotonic())
+                    if due:
+                        break
+                    timeout = None
+                    if self._pending:
+                        timeout = next(iter(self._pending.values())).deadline - time.monotonic()
+                    self._condition.wait(timeout)
+            self._send(due)
+
+    def _pop_due(self, now):
+        # pending updates are kept in deadline order
+        due = []
+        while self._pending:
+            if next(iter(self._pending.values())).deadline > now:
+                break
+            due.append(self._pending.popitem(last=False))
+        return due
+
+    def _send(self, due):
+        with self._sending:
+            for pk_or_id, pending in due:
+                try:
+                    result = self._client.update(pk_or_id, **pending.kwargs)
+                except Exception as error:  # pylint: disable=broad-except
+                    pending.future.set_exception(error)
+                else:
+                    pending.future.set_result(result)
+                self.sent += 1
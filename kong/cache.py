@@ -0,0 +1,202 @@
+import json
+import sqlite3
+import threading
+import time
+from hashlib import blake2b
+
+from kong.fingerprints import canonical
+from kong.validation import ENTITY_CLASSES
+
+# fields an entity can also be looked up by
+NAME_FIELDS = {
+    'apis': ('name',),
+    'consumers': ('username', 'custom_id'),
+    'services': ('name',),
+    'upstreams': ('name',),
+}
+
+# bumped when the tables change; older files are emptied and rebuilt
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entities (
+        entity_type TEXT NOT NULL,
+        id TEXT NOT NULL,
+        fingerprint INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        PRIMARY KEY (entity_type, id)
+    );
+    CREATE TABLE IF NOT EXISTS names (
+        entity_type TEXT NOT NULL,
+        name TEXT NOT NULL,
+        id TEXT NOT NULL,
+        PRIMARY KEY (entity_type, name)
+    );
+    CREATE INDEX IF NOT EXISTS names_by_id ON names (entity_type, id);
+    CREATE TABLE IF NOT EXISTS populated (
+        entity_type TEXT PRIMARY KEY,
+        at REAL NOT NULL
+    );
+"""
+
+
+def _signed(value):
+    # SQLite integers are signed 64 bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _names_of(entity_type, entity):
+    return [(entity_type, entity[field], entity['id'])
+            for field in NAME_FIELDS.get(entity_type, ()) if entity.get(field) is not None]
+
+
+class StateCache:
+    """
+        Entities listed from Kong kept in a SQLite file, so that a process
+        can start from the last known state instead of listing everything
+        again, then bring it up to date with revalidate().
+
+        Lookups go through an (entity_type, id) primary key, then through
+        a table of (entity_type, name) aliases holding one row per name
+        field set. Each thread gets its own connection.
+    """
+
+    def __init__(self, path, kong_admin_client=None, page_size=1000):
+        self.path = path
+        self._client = kong_admin_client
+        self.page_size = page_size
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._migrate()
+
+    def _migrate(self):
+        connection = self._connection
+        version, = connection.execute('PRAGMA user_version').fetchone()
+        if version != SCHEMA_VERSION:
+            connection.executescript(
+                'DROP TABLE IF EXISTS entities; DROP TABLE IF EXISTS names; '
+                'DROP TABLE IF EXISTS populated; PRAGMA user_version = %d;' % SCHEMA_VERSION)
+        connection.executescript(_SCHEMA)
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _list(self, entity_type):
+        client = getattr(self._client, entity_type)
+        return client._perform_list(self.page_size)  # pylint: disable=protected-access
+
+    @staticmethod
+    def _row(entity_type, entity):
+        # the canonical body is both stored and hashed, as fingerprint() would
+        body = canonical(entity)
+        digest = int.from_bytes(blake2b(body, digest_size=8).digest(), 'big')
+        return entity_type, entity['id'], _signed(digest), body.decode('utf-8')
+
+    def populate(self, entity_type, entities=None):
+        """
+            Replaces the cached entities of a type with the given ones, or
+            with a full listing when none are given.
+        """
+        if entities is None:
+            entities = self._list(entity_type)
+        rows, names = [], []
+        for entity in entities:
+            rows.append(self._row(entity_type, entity))
+            names.extend(_names_of(entity_type, entity))
+
+        with self._write_lock, self._connection as connection:
+            connection.execute('DELETE FROM entities WHERE entity_type = ?', (entity_type,))
+            connection.execute('DELETE FROM names WHERE entity_type = ?', (entity_type,))
+            connection.executemany('INSERT INTO entities VALUES (?, ?, ?, ?)', rows)
+            connection.executemany('INSERT OR REPLACE INTO names VALUES (?, ?, ?)', names)
+            connection.execute('INSERT OR REPLACE INTO populated VALUES (?, ?)',
+                               (entity_type, time.time()))
+
+    def revalidate(self, entity_type):
+        """
+            Lists the type again and writes only what changed; Kong 0.13
+            cannot list what changed since a given time. Returns the ids
+            added, changed and removed.
+        """
+        known = dict(self._connection.execute(
+            'SELECT id, fingerprint FROM entities WHERE entity_type = ?', (entity_type,)))
+
+        added, changed, upserts, names = [], [], [], []
+        for entity in self._list(entity_type):
+            row = self._row(entity_type, entity)
+            previous = known.pop(entity['id'], None)
+            if previous is None:
+                added.append(entity['id'])
+            elif previous != row[2]:
+                changed.append(entity['id'])
+            else:
+                continue
+            upserts.append(row)
+            names.extend(_names_of(entity_type, entity))
+        removed = list(known)
+        stale = [(entity_type, entity_id) for entity_id in changed + removed]
+
+        with self._write_lock, self._connection as connection:
+            connection.executemany('DELETE FROM names WHERE entity_type = ? AND id = ?', stale)
+            connection.executemany('INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?)',
+                                   upserts)
+            connection.executemany('INSERT OR REPLACE INTO names VALUES (?, ?, ?)', names)
+            connection.executemany('DELETE FROM entities WHERE entity_type = ? AND id = ?',
+                                   [(entity_type, entity_id) for entity_id in removed])
+            connection.execute('INSERT OR REPLACE INTO populated VALUES (?, ?)',
+                               (entity_type, time.time()))
+
+        return added, changed, removed
+
+    def warm(self, entity_types, max_age=None):
+        """
+            Populates the types never cached and revalidates the ones
+            older than max_age seconds, if given.
+        """
+        for entity_type in entity_types:
+            age = self.age(entity_type)
+            if age is None:
+                self.populate(entity_type)
+            elif max_age is not None and age > max_age:
+                self.revalidate(entity_type)
+
+    def age(self, entity_type):
+        row = self._connection.execute('SELECT at FROM populated WHERE entity_type = ?',
+                                       (entity_type,)).fetchone()
+        return time.time() - row[0] if row is not None else None
+
+    def get(self, entity_type, id_or_name):
+        connection = self._connection
+        row = connection.execute('SELECT body FROM entities WHERE entity_type = ? AND id = ?',
+                                 (entity_type, id_or_name)).fetchone()
+        if row is None:
+            row = connection.execute(
+                'SELECT body FROM names JOIN entities USING (entity_type, id) '
+                'WHERE names.entity_type = ? AND names.name = ?',
+                (entity_type, id_or_name)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def get_object(self, entity_type, id_or_name):
+        entity = self.get(entity_type, id_or_name)
+        return ENTITY_CLASSES[entity_type](**entity) if entity is not None else None
+
+    def load(self, entity_type):
+        for body, in self._connection.execute(
+                'SELECT body FROM entities WHERE entity_type = ?', (entity_type,)):
+            yield json.loads(body)
+
+    def count(self, entity_type):
+        return self._connection.execute('SELECT COUNT(*) FROM entities WHERE entity_type = ?',
+                                        (entity_type,)).fetchone()[0]
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
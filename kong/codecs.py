@@ -0,0 +1,82 @@
+import json
+
+
+class JsonCodec:
+    """
+        Standard library json, left to requests.
+    """
+
+    name = 'json'
+
+    @staticmethod
+    def encode(data):
+        return {'json': data}
+
+    @staticmethod
+    def decode(response):
+        return response.json()
+
+
+class FastJsonCodec:
+    """
+        Encodes bodies to bytes once and decodes responses straight from
+        the raw content buffer with the given functions.
+    """
+
+    headers = {'Content-Type': 'application/json'}
+
+    def __init__(self, dumps, loads, name=None):
+        self._dumps = dumps
+        self._loads = loads
+        self.name = name or dumps.__module__
+
+    def encode(self, data):
+        return {'data': self.dumps(data), 'headers': self.headers}
+
+    def decode(self, response):
+        return self._loads(response.content)
+
+    def dumps(self, data):
+        body = self._dumps(data)
+        return body.encode('utf-8') if isinstance(body, str) else body
+
+    def loads(self, content):
+        return self._loads(content)
+
+
+def _orjson_codec():
+    import orjson  # pylint: disable=import-error
+    return FastJsonCodec(orjson.dumps, orjson.loads, 'orjson')
+
+
+def _rapidjson_codec():
+    import rapidjson  # pylint: disable=import-error
+    return FastJsonCodec(rapidjson.dumps, rapidjson.loads, 'rapidjson')
+
+
+def _ujson_codec():
+    import ujson  # pylint: disable=import-error
+    return FastJsonCodec(ujson.dumps, ujson.loads, 'ujson')
+
+
+def _stdlib_codec():
+    return FastJsonCodec(lambda data: json.dumps(data, separators=(',', ':')),
+                         json.loads, 'json')
+
+
+FAST_CODECS = (_orjson_codec, _rapidjson_codec, _ujson_codec)
+
+DEFAULT_CODEC = JsonCodec()
+
+
+def fastest_codec():
+    """
+        Returns a codec using the fastest json library installed, falling
+        back to the standard library.
+    """
+    for factory in FAST_CODECS:
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _stdlib_codec()
@@ -0,0 +1,21 @@
+import json
+from hashlib import blake2b
+
+
+def canonical(entity, exclude=()):
+    """
+        Serializes an entity dict the same way whatever its key order.
+    """
+    if exclude:
+        entity = {key: value for key, value in entity.items() if key not in exclude}
+    return json.dumps(entity, sort_keys=True, separators=(',', ':'),
+                      default=str).encode('utf-8')
+
+
+def fingerprint(entity, exclude=()):
+    """
+        Returns a 64 bit content hash of an entity dict, skipping the
+        excluded fields.
+    """
+    digest = blake2b(canonical(entity, exclude), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
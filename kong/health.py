@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+UpstreamHealth = namedtuple('UpstreamHealth', ['healthy', 'unhealthy', 'off', 'error'])
+
+
+def summarize(health):
+    """
+        Counts the targets of a health_status response by state.
+    """
+    healthy = unhealthy = off = 0
+    for target in health.get('data', ()):
+        state = target.get('health')
+        if state == 'HEALTHY':
+            healthy += 1
+        elif state == 'UNHEALTHY':
+            unhealthy += 1
+        else:
+            off += 1
+    return UpstreamHealth(healthy, unhealthy, off, None)
+
+
+def health_sweep(upstream_admin_client, max_workers=16, page_size=1000, names=None):
+    """
+        Fetches the health of every upstream (or of the given names) with
+        at most max_workers requests in flight, returning an UpstreamHealth
+        per upstream name. A failed fetch is reported in its error field.
+    """
+    if names is None:
+        # pylint: disable=protected-access
+        names = [upstream['name'] for upstream in upstream_admin_client._perform_list(page_size)]
+
+    def fetch(name):
+        try:
+            return summarize(upstream_admin_client.health_status(name))
+        except Exception as error:  # pylint: disable=broad-except
+            return UpstreamHealth(0, 0, 0, '%s: %s' % (error.__class__.__name__, error))
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        return dict(zip(names, pool.map(fetch, names)))
+
+
+class HealthMonitor:
+    """
+        Sweeps every interval seconds and yields, after each sweep, the
+        upstreams whose summary changed as a dict of name to UpstreamHealth,
+        None marking the upstreams gone. The first sweep reports them all.
+    """
+
+    def __init__(self, upstream_admin_client, interval=10, max_workers=16, page_size=1000,
+                 sleep=None):
+        self._client = upstream_admin_client
+        self.interval = interval
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.states = {}
+        self._stopped = threading.Event()
+        self._sleep = sleep or self._stopped.wait
+
+    def sweep(self):
+        states = health_sweep(self._client, self.max_workers, self.page_size)
+
+        changes = {name: state for name, state in states.items()
+                   if self.states.get(name) != state}
+        for name in self.states.keys() - states.keys():
+            changes[name] = None
+
+        self.states = states
+        return changes
+
+    def stop(self):
+        self._stopped.set()
+
+    def __iter__(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            changes = self.sweep()
+            if changes:
+                yield changes
+
+            if self._stopped.is_set():
+                break
+            self._sleep(max(0., self.interval - (time.monotonic() - started)))
@@ -0,0 +1,233 @@
+import threading
+
+
+class EntityIndex:
+    """
+        In-memory index over the entities of a KongAbstractClient, built
+        from a single paged scan and kept up to date incrementally.
+    """
+
+    def __init__(self, client, page_size=1000):
+        self._client = client
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._entities = {}
+        self._indexes = self._empty_indexes()
+
+    @property
+    def indexed_fields(self):
+        raise NotImplementedError
+
+    def _empty_indexes(self):
+        return {field: {} for field in self.indexed_fields}
+
+    def _insert(self, indexes, entity):
+        raise NotImplementedError
+
+    def _discard(self, indexes, entity):
+        raise NotImplementedError
+
+    def refresh(self):
+        """
+            Rebuilds the index with one paged scan; lookups keep being served
+            from the previous state until the new one is swapped in.
+        """
+        self.build(self._client.list(self.page_size))
+
+    def build(self, entities):
+        by_id = {}
+        indexes = self._empty_indexes()
+        for entity in entities:
+            by_id[entity.id] = entity
+            self._insert(indexes, entity)
+
+        with self._lock:
+            self._entities, self._indexes = by_id, indexes
+
+    def upsert(self, entity):
+        with self._lock:
+            previous = self._entities.get(entity.id)
+            if previous is not None:
+                self._discard(self._indexes, previous)
+            self._entities[entity.id] = entity
+            self._insert(self._indexes, entity)
+
+    def remove(self, entity_id):
+        with self._lock:
+            entity = self._entities.pop(entity_id, None)
+            if entity is not None:
+                self._discard(self._indexes, entity)
+        return entity
+
+    def refresh_one(self, pk_or_id):
+        try:
+            entity = self._client.retrieve(pk_or_id)
+        except NameError:
+            previous = self._resolve_id(pk_or_id)
+            if previous is not None:
+                self.remove(previous)
+            return None
+
+        self.upsert(entity)
+        return entity
+
+    def _resolve_id(self, pk_or_id):
+        if pk_or_id in self._entities:
+            return pk_or_id
+        return None
+
+    def __len__(self):
+        return len(self._entities)
+
+    def __iter__(self):
+        return iter(list(self._entities.values()))
+
+
+class ConsumerIndex(EntityIndex):
+    """
+        Hash indexes of consumers by id, username and custom_id.
+    """
+
+    @property
+    def indexed_fields(self):
+        return 'id', 'username', 'custom_id'
+
+    def _insert(self, indexes, entity):
+        for field in self.indexed_fields:
+            value = getattr(entity, field, None)
+            if value is not None:
+                indexes[field][value] = entity
+
+    def _discard(self, indexes, entity):
+        for field in self.indexed_fields:
+            value = getattr(entity, field, None)
+            if indexes[field].get(value) is entity:
+                del indexes[field][value]
+
+    def by_id(self, consumer_id):
+        return self._indexes['id'].get(consumer_id)
+
+    def by_username(self, username):
+        return self._indexes['username'].get(username)
+
+    def by_custom_id(self, custom_id):
+        return self._indexes['custom_id'].get(custom_id)
+
+    def get(self, key, default=None):
+        """
+            Looks the key up as an id, then as a username and finally as a
+            custom_id.
+        """
+        indexes = self._indexes
+        for field in self.indexed_fields:
+            consumer = indexes[field].get(key)
+            if consumer is not None:
+                return consumer
+        return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def _resolve_id(self, pk_or_id):
+        consumer = self.get(pk_or_id)
+        return consumer.id if consumer is not None else None
+
+
+class PluginIndex(EntityIndex):
+    """
+        Indexes plugins by the entities they are scoped to and by name, and
+        resolves which of them Kong applies to a request.
+    """
+
+    scope_fields = 'route_id', 'service_id', 'consumer_id', 'api_id'
+
+    # Kong 0.13 precedence, most specific first. Apis take the place of
+    # routes since a plugin is never scoped to both.
+    precedence = (
+        frozenset(['route_id', 'service_id', 'consumer_id']),
+        frozenset(['route_id', 'consumer_id']),
+        frozenset(['api_id', 'consumer_id']),
+        frozenset(['service_id', 'consumer_id']),
+        frozenset(['route_id', 'service_id']),
+        frozenset(['consumer_id']),
+        frozenset(['route_id']),
+        frozenset(['api_id']),
+        frozenset(['service_id']),
+        frozenset(),
+    )
+
+    _ranks = {scope: rank for rank, scope in enumerate(precedence)}
+
+    @property
+    def indexed_fields(self):
+        return self.scope_fields + ('name',)
+
+    def _empty_indexes(self):
+        indexes = super(PluginIndex, self)._empty_indexes()
+        indexes[None] = {}
+        return indexes
+
+    def _scope(self, plugin):
+        return frozenset(field for field in self.scope_fields
+                         if getattr(plugin, field, None) is not None)
+
+    def _insert(self, indexes, entity):
+        for field in self.indexed_fields:
+            value = getattr(entity, field, None)
+            if value is not None:
+                indexes[field].setdefault(value, {})[entity.id] = entity
+        if not self._scope(entity):
+            indexes[None][entity.id] = entity
+
+    def _discard(self, indexes, entity):
+        for field in self.indexed_fields:
+            value = getattr(entity, field, None)
+            bucket = indexes[field].get(value)
+            if bucket is not None:
+                bucket.pop(entity.id, None)
+                if not bucket:
+                    del indexes[field][value]
+        indexes[None].pop(entity.id, None)
+
+    def lookup(self, field, value):
+        return list(self._indexes[field].get(value, {}).values())
+
+    def by_name(self, name):
+        return self.lookup('name', name)
+
+    def global_plugins(self):
+        return list(self._indexes[None].values())
+
+    def applicable(self, route_id=None, service_id=None, consumer_id=None, api_id=None):
+        """
+            Returns the enabled plugins whose scope matches the request
+            context, most specific first.
+        """
+        context = {'route_id': route_id, 'service_id': service_id,
+                   'consumer_id': consumer_id, 'api_id': api_id}
+        indexes = self._indexes
+
+        candidates = dict(indexes[None])
+        for field, value in context.items():
+            if value is not None:
+                candidates.update(indexes[field].get(value, {}))
+
+        ranked = []
+        for plugin in candidates.values():
+            if getattr(plugin, 'enabled', True) is False:
+                continue
+            scope = self._scope(plugin)
+            if all(getattr(plugin, field) == context[field] for field in scope):
+                ranked.append((self._ranks.get(scope, len(self._ranks)), plugin))
+
+        ranked.sort(key=lambda rank_and_plugin: rank_and_plugin[0])
+        return [plugin for _, plugin in ranked]
+
+    def effective(self, route_id=None, service_id=None, consumer_id=None, api_id=None):
+        """
+            Returns the plugin Kong runs for every plugin name, keyed by name.
+        """
+        effective = {}
+        for plugin in self.applicable(route_id, service_id, consumer_id, api_id):
+            effective.setdefault(plugin.name, plugin)
+        return effective
@@ -1,24 +1,93 @@
+import threading
 from abc import abstractmethod
-from urllib3.util.url import Url, parse_url
-from requests import session
+from functools import lru_cache
 from kong.structures import ApiData, ServiceData, ConsumerData, \
     PluginData, RouteData, TargetData, UpstreamData
+from kong.codecs import DEFAULT_CODEC
 from kong.exceptions import SchemaViolation
+from kong.tracing import NULL_TRACER, traced
 
 
-class RestClient:  # pylint:disable=too-few-public-methods
+_DEFAULT_SESSION = []
+_DEFAULT_SESSION_LOCK = threading.Lock()
 
-    def __init__(self, url, _session=session()):
+
+def default_session():
+    """
+        The session shared by the clients given none. It is created on first
+        use, so importing the package does not import requests.
+    """
+    with _DEFAULT_SESSION_LOCK:
+        if not _DEFAULT_SESSION:
+            from requests import session
+            _DEFAULT_SESSION.append(session())
+    return _DEFAULT_SESSION[0]
+
+
+class RestClient:  # pylint:disable=too-few-public-methods,too-many-instance-attributes
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, url, _session=None, tracer=None, codec=None, plan=None,
+                 singleflight=None, cache=None, schema_registry=None):
         self._session = _session
+        self._tracer = tracer or NULL_TRACER
+        self._codec = codec or DEFAULT_CODEC
+        self._plan = plan
+        self._singleflight = singleflight
+        self._cache = cache
+        self._schema_registry = schema_registry
 
         self.url = self._normalize_url(url)
 
     @property
     def session(self):
+        if self._session is None:
+            self._session = default_session()
         return self._session
 
+    @property
+    def tracer(self):
+        return self._tracer
+
+    @property
+    def codec(self):
+        return self._codec
+
+    @property
+    def plan(self):
+        return self._plan
+
+    @property
+    def singleflight(self):
+        return self._singleflight
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def schema_registry(self):
+        return self._schema_registry
+
+    def _coalesce(self, key, function):
+        if self._singleflight is None:
+            return function()
+        return self._singleflight.do(key, function)
+
+    def _request(self, method, url, **kwargs):
+        if not self._tracer.enabled:
+            return getattr(self.session, method)(url, **kwargs)
+
+        with self.tracer.span('HTTP ' + method.upper(), method=method.upper(), url=url) as span:
+            response = getattr(self.session, method)(url, **kwargs)
+            span.set_attribute('status_code', response.status_code)
+        return response
+
     @staticmethod
+    @lru_cache(maxsize=256)
     def _normalize_url(url):
+        from urllib3.util.url import Url, parse_url
+
         url = parse_url(url)
 
         path = url.path or ''
@@ -40,38 +109,86 @@ class KongAdminClient(RestClient):
     def __init__(self, *args, **kwargs):
         super(KongAdminClient, self).__init__(*args, **kwargs)
 
-        self.apis = ApiAdminClient(self.url, self.session)
-        self.consumers = ConsumerAdminClient(self.url, self.session)
-        self.plugins = PluginAdminClient(self.url, self.session)
-        self.services = ServiceAdminClient(self.url, self.session)
-        self.routes = RouteAdminClient(self.url, self.session)
-        self.upstreams = UpstreamAdminClient(self.url, self.session)
-        self.targets = TargetAdminClient(self.url, self.session)
+        self.apis = self._make_client(ApiAdminClient)
+        self.consumers = self._make_client(ConsumerAdminClient)
+        self.plugins = self._make_client(PluginAdminClient)
+        self.services = self._make_client(ServiceAdminClient)
+        self.routes = self._make_client(RouteAdminClient)
+        self.upstreams = self._make_client(UpstreamAdminClient)
+        self.targets = self._make_client(TargetAdminClient)
+
+    def _make_client(self, client_class):
+        return client_class(self.url, self._session, tracer=self.tracer, codec=self.codec,
+                            plan=self.plan, singleflight=self.singleflight, cache=self.cache,
+                            schema_registry=self.schema_registry)
 
+    @traced
     def node_status(self):
-        return self.session.get(self.url + 'status/').json()
+        return self._codec.decode(self._request('get', self.url + 'status/'))
 
+    @traced
     def node_information(self):
-        return self.session.get(self.url).json()
+        return self._codec.decode(self._request('get', self.url))
+
+    def watch(self, *args, **kwargs):
+        """
+            Returns a Watcher; iterating it polls forever, yielding an
+            Event per added, changed or removed entity until stop() is
+            called.
+        """
+        from kong.watch import Watcher
+
+        return Watcher(self, *args, **kwargs)
+
+    def dry_run(self):
+        """
+            Returns a client sharing this one's session whose writes are
+            recorded into its plan instead of being sent; reads still hit
+            Kong.
+        """
+        from kong.planning import Plan
+
+        return KongAdminClient(self.url, self._session, tracer=self.tracer, codec=self.codec,
+                               plan=Plan(), singleflight=self.singleflight, cache=self.cache,
+                               schema_registry=self.schema_registry)
+
+    def replicate_to(self, targets, **kwargs):
+        """
+            Copies this cluster's entities to every target KongAdminClient
+            concurrently and returns a ReplicationReport per target.
+        """
+        from kong.replication import Replicator
+
+        return Replicator(self, targets, **kwargs).run()
 
 
 class KongAbstractClient(RestClient):
 
+    def __init__(self, *args, **kwargs):
+        super(KongAbstractClient, self).__init__(*args, **kwargs)
+
+        self._endpoint = self.url + self._path
+
     @property
     @abstractmethod
     def _object_data_class(self):
         return lambda x: x
 
     def _to_object_data(self, data_dict):
+        if not isinstance(data_dict, dict):
+            # a PlannedOperation, when dry running
+            return data_dict
         return self._object_data_class(**data_dict)
 
     def _to_list_object_data(self, list_data_dict):
         return map(self._to_object_data, list_data_dict)
 
+    @traced
     def create(self, **kwargs):
         data_dict = self._perform_create(**kwargs)
         return self._to_object_data(data_dict)
 
+    @traced
     def delete(self, pk_or_id, **kwargs):
         self._perform_delete(pk_or_id, **kwargs)
 
@@ -79,17 +196,110 @@ class KongAbstractClient(RestClient):
         data_dict = self._perform_list(size, **kwargs)
         return self._to_list_object_data(data_dict)
 
+    def filter(self, size=10, **predicates):
+        """
+            Lists the entities matching every predicate. Equality predicates
+            on fields Kong can filter by are sent in the query string; the
+            rest, and any callable predicate, are applied to each row.
+        """
+        server, local = self._plan_filters(predicates)
+
+        data_dict = self._paginate(size, self._validate_query_params(server),
+                                   endpoint=self.endpoint, operation='filter')
+
+        if local:
+            data_dict = (element for element in data_dict
+                         if self._matches(element, local))
+
+        return self._to_list_object_data(data_dict)
+
+    def _plan_filters(self, predicates):
+        server, local = {}, []
+        allowed_query_params = self._allowed_query_params
+        allowed_fields = self._object_data_class.allowed_parameters
+
+        for field, predicate in predicates.items():
+            if callable(predicate):
+                if field not in allowed_fields and field not in allowed_query_params:
+                    raise KeyError('invalid filter: %s' % field)
+                local.append((field, predicate))
+            elif field in allowed_query_params:
+                server[field] = predicate
+            elif field in allowed_fields:
+                local.append((field, lambda value, expected=predicate: value == expected))
+            else:
+                raise KeyError('invalid filter: %s' % field)
+
+        return server, local
+
+    def write_behind(self, window=1.0):
+        """
+            Returns a WriteBehindBuffer merging the updates sent to each
+            pk_or_id within window seconds into one.
+        """
+        from kong.buffering import WriteBehindBuffer
+
+        return WriteBehindBuffer(self, window)
+
+    def snapshot(self, path, size=1000, **kwargs):
+        """
+            Writes every entity listed to a snapshot file, see
+            kong.snapshots.Snapshot to read it.
+        """
+        from kong.snapshots import write_snapshot
+
+        return write_snapshot(path, self._perform_list(size), **kwargs)
+
+    def parallel_list(self, size=1000, processes=None, executor=None, **kwargs):
+        """
+            Like list(), but pages are decoded and validated in a process
+            pool, so that huge listings use every core.
+        """
+        from kong.materialize import ParallelMaterializer
+
+        return ParallelMaterializer(self, size, processes, executor, **kwargs)
+
+    def export(self, file, size=1000, processes=None, executor=None, **kwargs):
+        """
+            Writes every entity listed as a json line to a binary file,
+            built in a process pool, and returns how many were written.
+        """
+        return self.parallel_list(size, processes, executor, **kwargs).export(file)
+
+    def merkle_tree(self, size=1000, **kwargs):
+        """
+            Builds a MerkleTree over every entity listed, see MerkleTree
+            for the arguments.
+        """
+        from kong.merkle import MerkleTree
+
+        return MerkleTree(self._perform_list(size), **kwargs)
+
+    @staticmethod
+    def _matches(element, local):
+        for field, predicate in local:
+            if not predicate(element.get(field)):
+                return False
+        return True
+
+    @traced
     def retrieve(self, pk_or_id):
         data_dict = self._perform_retrieve(pk_or_id)
         return self._to_object_data(data_dict)
 
+    @traced
     def update(self, pk_or_id, **kwargs):
         data_dict = self._perform_update(pk_or_id, **kwargs)
         return self._to_object_data(data_dict)
 
     @property
     def endpoint(self):
-        return self.url + self._path
+        return self._endpoint
+
+    @property
+    def _cache_key_fields(self):
+        # the fields Kong retrieves an entity by, each cached under its own url
+        return ('id',)
 
     @abstractmethod
     def _path(self):
@@ -107,7 +317,10 @@ class KongAbstractClient(RestClient):
 
         endpoint = endpoint or self.endpoint
 
-        response = self.session.post(endpoint, json=data)
+        if self._plan is not None:
+            return self._plan.record('post', endpoint, data)
+
+        response = self._request('post', endpoint, **self._codec.encode(data))
 
         if response.status_code == 409:
             raise NameError(response.content)
@@ -115,11 +328,16 @@ class KongAbstractClient(RestClient):
         if response.status_code != 201:
             raise Exception(response.content)
 
-        return response.json()
+        return self._codec.decode(response)
 
     def _send_delete(self, name_or_id, endpoint=None):
-        url = (endpoint or self.endpoint) + name_or_id
-        response = self.session.delete(url)
+        endpoint = endpoint or self.endpoint
+        url = endpoint + name_or_id
+
+        if self._plan is not None:
+            return self._plan.record('delete', url)
+
+        response = self._request('delete', url)
 
         if response.status_code == 404:
             raise NameError(response.content)
@@ -127,10 +345,23 @@ class KongAbstractClient(RestClient):
         if response.status_code != 204:
             raise Exception(response.content)
 
+        if self._cache is not None:
+            urls = {url, self.endpoint + name_or_id}
+            self._evict(urls, self._cached(urls))
+
+        return None
+
     def _send_update(self, pk_or_id, data, endpoint=None):
-        url = (endpoint or self.endpoint) + pk_or_id
+        endpoint = endpoint or self.endpoint
+        url = endpoint + pk_or_id
+
+        if self._plan is not None:
+            return self._plan.record('patch', url, data)
 
-        response = self.session.patch(url, json=data)
+        urls = {url, self.endpoint + pk_or_id}
+        cached = self._cached(urls) if self._cache is not None else None
+
+        response = self._request('patch', url, **self._codec.encode(data))
 
         if response.status_code == 400:
             raise KeyError(response.content)
@@ -141,18 +372,28 @@ class KongAbstractClient(RestClient):
         if response.status_code != 200:
             raise Exception(response.content)
 
-        return response.json()
+        updated = self._codec.decode(response)
+
+        if self._cache is not None:
+            self._evict(urls, cached, updated)
+            self._store(url, updated)
+
+        return updated
 
-    def _send_list(self, size=10, offset=None, **kwargs):
+    def _send_list(self, size=10, offset=None, endpoint=None, **kwargs):
         data = {**{'offset': offset, 'size': size}, **kwargs}
+        endpoint = endpoint or self.endpoint
+
+        return self._coalesce(('get', endpoint, tuple(sorted(data.items(), key=str))),
+                              lambda: self._fetch_list(endpoint, data))
 
-        response = self.session.get(self.endpoint,
-                                    data=data)
+    def _fetch_list(self, endpoint, data):
+        response = self._request('get', endpoint, params=data)
 
         if response.status_code != 200:
             raise Exception(response.content)
 
-        response = response.json()
+        response = self._codec.decode(response)
 
         if 'data' in response:
             elements = response['data']
@@ -174,7 +415,43 @@ class KongAbstractClient(RestClient):
     def _send_retrieve(self, name_or_id, endpoint=None):
         endpoint = endpoint or self.endpoint
         url = endpoint + name_or_id
-        response = self.session.get(url)
+
+        if self._cache is None:
+            return self._coalesce(('get', url), lambda: self._fetch(url))
+
+        cached = self._cache.get(url)
+        if cached is None:
+            cached = self._coalesce(('get', url), lambda: self._fetch(url))
+            self._store(url, cached)
+        return cached
+
+    def _aliases(self, *entities):
+        # against the canonical endpoint, whichever one a write went through
+        endpoint = self.endpoint
+        return {endpoint + str(entity[field]) for entity in entities if isinstance(entity, dict)
+                for field in self._cache_key_fields if entity.get(field) is not None}
+
+    def _cached(self, urls):
+        for url in urls:
+            cached = self._cache.get(url)
+            if cached is not None:
+                return cached
+        return None
+
+    def _store(self, url, entity):
+        for alias in self._aliases(entity) | {url}:
+            self._cache.set(alias, entity)
+
+    def _evict(self, urls, *entities):
+        """
+            Drops every url an entity was cached under, by id or by name,
+            whichever of them was written to.
+        """
+        for alias in self._aliases(*entities) | urls:
+            self._cache.delete(alias)
+
+    def _fetch(self, url):
+        response = self._request('get', url)
 
         if response.status_code == 404:
             raise NameError(response.content)
@@ -182,7 +459,7 @@ class KongAbstractClient(RestClient):
         if response.status_code != 200:
             raise Exception(response.content)
 
-        return response.json()
+        return self._codec.decode(response)
 
     def _validate_params(self, query_params, allowed_params):
         validated_params = {}
@@ -212,16 +489,41 @@ class KongAbstractClient(RestClient):
 
         query_params = self._validate_query_params(kwargs)
 
-        def generator():
-            offset = None
-            while True:
-                offset, cached = self._send_list(size, offset, **query_params)
+        return self._paginate(size, query_params)
 
-                while cached:
-                    yield cached.pop()
+    def _paginate(self, size, query_params, endpoint=None, operation='list'):
+        tracer = self.tracer
+        name = '%s.%s' % (self.__class__.__name__, operation)
+        span_endpoint = endpoint or self.endpoint
 
-                if offset is None:
-                    break
+        def generator():
+            # opened on the first page, an unconsumed listing traces nothing
+            span = tracer.start_span(name, endpoint=span_endpoint, size=size)
+            offset = None
+            pages = 0
+            count = 0
+            try:
+                while True:
+                    with tracer.activate(span), \
+                            tracer.span('page', offset=offset, size=size) as page_span:
+                        offset, cached = self._send_list(size, offset, endpoint=endpoint,
+                                                         **query_params)
+                        page_span.set_attribute('count', len(cached))
+                    pages += 1
+
+                    while cached:
+                        count += 1
+                        yield cached.pop()
+
+                    if offset is None:
+                        break
+            except Exception as error:
+                span.finish(error)
+                raise
+            finally:
+                span.set_attribute('pages', pages)
+                span.set_attribute('count', count)
+                span.finish()
 
         return generator()
 
@@ -264,6 +566,10 @@ class ConsumerAdminClient(KongAbstractClient):
     def _path(self):
         return 'consumers/'
 
+    @property
+    def _cache_key_fields(self):
+        return 'id', 'username'
+
     @property
     def _allowed_query_params(self):
         return ['id'] + self._allowed_update_params
@@ -287,6 +593,11 @@ class ConsumerAdminClient(KongAbstractClient):
 
 class PluginAdminClient(KongAbstractClient):
 
+    def __init__(self, *args, **kwargs):
+        super(PluginAdminClient, self).__init__(*args, **kwargs)
+
+        self._apis_endpoint = self.url + 'apis/'
+
     @property
     def _object_data_class(self):
         return PluginData
@@ -304,7 +615,7 @@ class PluginAdminClient(KongAbstractClient):
         return 'name', 'consumer_id'
 
     def _make_api_plugin_endpoint(self, api_pk):
-        return self.url + 'apis/' + api_pk + '/' + self._path
+        return self._apis_endpoint + api_pk + '/' + self._path
 
     @staticmethod
     def _add_config_to_data(data, config):
@@ -328,19 +639,26 @@ class PluginAdminClient(KongAbstractClient):
 
         endpoint = self._resolve_endpoint(api_name_or_id)
 
+        self._validate_config(name, config)
+
         data = self._add_config_to_data(data, config)
 
         return self._send_create(data, endpoint=endpoint)
 
+    def _validate_config(self, name, config, partial=False):
+        if self._schema_registry is not None:
+            self._schema_registry.validate(name, config, partial=partial)
+
     def _perform_delete(self, plugin_id, api_pk=None):  # pylint: disable=arguments-differ
         endpoint = self._resolve_endpoint(api_pk)
 
         return self._send_delete(plugin_id, endpoint=endpoint)
 
+    @traced
     def retrieve_enabled(self):
-        list_data_dict = self._perform_retrieve('enabled/')["enabled_plugins"]
-        return self._to_list_object_data(list_data_dict)
+        return self._perform_retrieve('enabled/')["enabled_plugins"]
 
+    @traced
     def retrieve_schema(self, plugin_name):
         return self._perform_retrieve('schema/' + plugin_name)
 
@@ -349,6 +667,11 @@ class PluginAdminClient(KongAbstractClient):
 
         query_params = self._validate_update_params(kwargs)
 
+        if config is not None and self._schema_registry is not None:
+            # the name is needed to pick the schema, updates rarely send it
+            name = kwargs.get('name') or self._send_retrieve(pk_or_id)['name']
+            self._validate_config(name, config, partial=True)
+
         endpoint = self._resolve_endpoint(api_pk)
 
         query_params = self._add_config_to_data(query_params, config)
@@ -381,6 +704,10 @@ class ApiAdminClient(KongAbstractClient):
     def _path(self):
         return 'apis/'
 
+    @property
+    def _cache_key_fields(self):
+        return 'id', 'name'
+
     # pylint: disable=arguments-differ
     def _perform_create(self, name=None, api_data=None, upstream_url=None, **kwargs):
 
@@ -419,6 +746,10 @@ class ServiceAdminClient(KongAbstractClient):
     def _path(self):
         return 'services/'
 
+    @property
+    def _cache_key_fields(self):
+        return 'id', 'name'
+
     def _perform_create(self, **kwargs):
         service = ServiceData(**kwargs)
         return self._send_create(service.as_dict())
@@ -426,6 +757,11 @@ class ServiceAdminClient(KongAbstractClient):
 
 class RouteAdminClient(KongAbstractClient):
 
+    def __init__(self, *args, **kwargs):
+        super(RouteAdminClient, self).__init__(*args, **kwargs)
+
+        self._services_endpoint = self.url + 'services/'
+
     @property
     def _object_data_class(self):
         return RouteData
@@ -453,10 +789,12 @@ class RouteAdminClient(KongAbstractClient):
 
     def list_associated_to_service(self, service_or_pk, size=10, **kwargs):
 
-        manager = KongAbstractClient(self.url, _session=self.session)
-        manager._path = 'services/%s/routes/' % self.get_service_id(service_or_pk)
+        endpoint = self._services_endpoint + self.get_service_id(service_or_pk) + '/routes/'
 
-        list_data_dict = manager._perform_list(size, **kwargs)
+        query_params = self._validate_query_params(kwargs)
+
+        list_data_dict = self._paginate(size, query_params, endpoint=endpoint,
+                                        operation='list_associated_to_service')
         return self._to_list_object_data(list_data_dict)
 
     @staticmethod
@@ -494,17 +832,24 @@ class UpstreamAdminClient(KongAbstractClient):
     def _path(self):
         return 'upstreams/'
 
+    @property
+    def _cache_key_fields(self):
+        return 'id', 'name'
+
+    @traced
     def health_status(self, name_or_id):
         url = self.endpoint + name_or_id + '/health/'
-        response = self.session.get(url)
 
-        if response.status_code == 404:
-            raise NameError(response.content)
+        return self._coalesce(('get', url), lambda: self._fetch(url))
 
-        if response.status_code != 200:
-            raise Exception(response.content)
+    def health_sweep(self, max_workers=16, names=None):
+        """
+            Fetches the health of every upstream concurrently and returns
+            a summary per upstream name, see kong.health.
+        """
+        from kong.health import health_sweep
 
-        return response.json()
+        return health_sweep(self, max_workers, names=names)
 
 
 class TargetAdminClient(KongAbstractClient):
@@ -551,12 +896,46 @@ class TargetAdminClient(KongAbstractClient):
 
         return super(TargetAdminClient, self)._perform_list(size, **kwargs)
 
+    #  pylint: disable=arguments-differ
+    def filter(self, upstream_name_or_id, size=10, **predicates):
+        self.configure_endpoint(upstream_name_or_id)
+
+        return super(TargetAdminClient, self).filter(size, **predicates)
+
+    #  pylint: disable=arguments-differ
+    def merkle_tree(self, upstream_name_or_id, size=1000, **kwargs):
+        from kong.merkle import MerkleTree
+
+        return MerkleTree(self._perform_list(upstream_name_or_id, size), **kwargs)
+
+    #  pylint: disable=arguments-differ
+    def snapshot(self, upstream_name_or_id, path, size=1000, **kwargs):
+        from kong.snapshots import write_snapshot
+
+        return write_snapshot(path, self._perform_list(upstream_name_or_id, size), **kwargs)
+
+    #  pylint: disable=arguments-differ
+    def parallel_list(self, upstream_name_or_id, size=1000, processes=None, executor=None,
+                      **kwargs):
+        self.configure_endpoint(upstream_name_or_id)
+
+        return super(TargetAdminClient, self).parallel_list(size, processes, executor, **kwargs)
+
+    #  pylint: disable=arguments-differ
+    def export(self, upstream_name_or_id, file, size=1000, processes=None, executor=None,
+               **kwargs):
+        return self.parallel_list(upstream_name_or_id, size, processes, executor,
+                                  **kwargs).export(file)
+
     def list_all(self, upstream_name_or_id, size=10, **kwargs):
         self.configure_endpoint(upstream_name_or_id)
 
         self.endpoint += 'all/'
 
-        list_data_dict = super(TargetAdminClient, self)._perform_list(size, **kwargs)
+        query_params = self._validate_query_params(kwargs)
+
+        list_data_dict = self._paginate(size, query_params, endpoint=self.endpoint,
+                                        operation='list_all')
         return self._to_list_object_data(list_data_dict)
 
     #  pylint: disable=arguments-differ
@@ -565,15 +944,22 @@ class TargetAdminClient(KongAbstractClient):
 
         return super(TargetAdminClient, self)._perform_delete(target_or_id)
 
+    @traced
     def set_healthy(self, upstream_name_or_id, target_or_id, is_healthy):
         url = self.url + (self._path % upstream_name_or_id) \
               + target_or_id \
               + ('/healthy/' if is_healthy else '/unhealthy/')
-        response = self.session.post(url)
+
+        if self._plan is not None:
+            return self._plan.record('post', url)
+
+        response = self._request('post', url)
 
         if response.status_code != 204:
             raise Exception(response.content)
 
+        return None
+
     def _perform_update(self, pk_or_id, **kwargs):
         raise NotImplementedError
 
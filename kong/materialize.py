@@ -0,0 +1,136 @@
+import json
+import marshal
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from kong.codecs import fastest_codec
+
+_OFFSET_KEY = b'"offset":'
+
+_CODEC = []
+
+
+def _codec():
+    if not _CODEC:
+        _CODEC.append(fastest_codec())
+    return _CODEC[0]
+
+
+def _loads(content):
+    return _codec().loads(content)
+
+
+def envelope_offset(content):
+    """
+        Finds the offset of a raw listing page without decoding its data.
+        A top level "offset" after the last ']' can only follow the data
+        array; any other layout is decoded in full.
+    """
+    position = content.rfind(_OFFSET_KEY)
+    if position < 0:
+        return None
+    if position < content.rfind(b']'):
+        return _loads(content).get('offset')
+
+    value, _ = json.JSONDecoder().raw_decode(
+        content[position + len(_OFFSET_KEY):].lstrip().decode('utf-8'))
+    return value
+
+
+def materialize_page(object_data_class, content, lines=False):
+    """
+        Runs in a worker process: decodes a raw page and validates each
+        record through object_data_class. Returns the records' as_dict()
+        marshalled, or as json lines when lines is set.
+    """
+    elements = _loads(content).get('data') or []
+    records = [object_data_class(**element).as_dict() for element in elements]
+    if lines:
+        dumps = _codec().dumps
+        return b''.join([dumps(record) + b'\n' for record in records])
+    return marshal.dumps(records)
+
+
+def _restore(object_data_class, records):
+    # already validated by the worker
+    new = object_data_class.__new__
+    for record in records:
+        object_data = new(object_data_class)
+        object_data.__dict__ = record
+        yield object_data
+
+
+class ParallelMaterializer:  # pylint: disable=too-many-instance-attributes
+    """
+        Lists a client's entities page by page, handing each raw page to
+        a process pool which decodes and validates it, while the next
+        page is fetched with the offset found by envelope_offset().
+
+        At most max_pending pages are in flight; results come back in
+        page order.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, client, size=1000, processes=None, executor=None, max_pending=None,
+                 **kwargs):
+        self._client = client
+        self.endpoint = client.endpoint
+        self.size = size
+        self.processes = processes
+        self.executor = executor
+        self.max_pending = max_pending
+        # pylint: disable=protected-access
+        self._query_params = client._validate_query_params(kwargs)
+        self._object_data_class = client._object_data_class
+
+    def _pages(self):
+        # pylint: disable=protected-access
+        client = self._client
+        endpoint = self.endpoint
+        offset = None
+        while True:
+            data = {**{'offset': offset, 'size': self.size}, **self._query_params}
+            response = client._request('get', endpoint, params=data)
+            if response.status_code != 200:
+                raise Exception(response.content)
+
+            yield response.content
+
+            offset = envelope_offset(response.content)
+            if offset is None:
+                break
+
+    def _map(self, lines):
+        executor = self.executor or ProcessPoolExecutor(self.processes)
+        max_pending = self.max_pending or 2 * (self.processes or os.cpu_count() or 1)
+        pending = deque()
+        try:
+            for content in self._pages():
+                pending.append(executor.submit(materialize_page, self._object_data_class,
+                                               content, lines))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown()
+
+    def __iter__(self):
+        object_data_class = self._object_data_class
+        for payload in self._map(False):
+            yield from _restore(object_data_class, marshal.loads(payload))
+
+    def export(self, file):
+        """
+            Writes every record as a json line to a binary file without
+            decoding it in this process, and returns how many were written.
+        """
+        count = 0
+        for payload in self._map(True):
+            file.write(payload)
+            count += payload.count(b'\n')
+        return count
@@ -0,0 +1,135 @@
+from hashlib import blake2b
+from zlib import crc32
+
+from kong.fingerprints import fingerprint
+
+TIMESTAMPS = ('created_at', 'updated_at')
+
+EMPTY = bytes(8)
+
+
+def _hash(*parts):
+    digest = blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part)
+    return digest.digest()
+
+
+class MerkleTree:
+    """
+        Binary hash tree over the fingerprints of a set of entities, which
+        are spread by key over a fixed number of leaf buckets. Two trees
+        built with the same settings have the same root when they hold the
+        same entities; otherwise only the differing subtrees have to be
+        compared.
+
+        key is the field (or a function of the entity dict) naming each
+        entity. Comparing two clusters, where Kong generates different ids
+        and timestamps, takes a natural key and those fields excluded.
+    """
+
+    def __init__(self, entities=(), key='id', exclude=TIMESTAMPS, buckets=256):
+        if buckets < 1 or buckets & (buckets - 1):
+            raise ValueError('buckets must be a power of two')
+
+        self._key = key if callable(key) else (lambda entity: entity[key])
+        self.exclude = frozenset(exclude)
+        self.buckets = buckets
+        self._leaves = [{} for _ in range(buckets)]
+        self._nodes = [EMPTY] * (2 * buckets)
+        self._dirty = set(range(buckets))
+
+        for entity in entities:
+            self.add(entity)
+
+    def _bucket_of(self, key):
+        return crc32(str(key).encode('utf-8')) & (self.buckets - 1)
+
+    def add(self, entity):
+        key = self._key(entity)
+        index = self._bucket_of(key)
+        self._leaves[index][key] = fingerprint(entity, self.exclude)
+        self._dirty.add(index)
+
+    def remove(self, key):
+        index = self._bucket_of(key)
+        if self._leaves[index].pop(key, None) is not None:
+            self._dirty.add(index)
+
+    def _rehash(self):
+        if not self._dirty:
+            return
+
+        nodes = self._nodes
+        parents = set()
+        for index in self._dirty:
+            leaf = self._leaves[index]
+            if leaf:
+                parts = [b'%s\0%s' % (str(key).encode('utf-8'), value.to_bytes(8, 'big'))
+                         for key, value in sorted(leaf.items(), key=lambda item: str(item[0]))]
+                nodes[self.buckets + index] = _hash(*parts)
+            else:
+                nodes[self.buckets + index] = EMPTY
+            parents.add((self.buckets + index) // 2)
+        self._dirty = set()
+
+        while parents:
+            above = set()
+            for node in parents:
+                left, right = nodes[2 * node], nodes[2 * node + 1]
+                nodes[node] = EMPTY if left == right == EMPTY else _hash(left, right)
+                if node > 1:
+                    above.add(node // 2)
+            parents = above
+
+    @property
+    def root(self):
+        return self.node(1)
+
+    def node(self, index):
+        """
+            Hash of a node; 1 is the root and the children of n are 2n and
+            2n + 1, so leaf bucket i is node buckets + i.
+        """
+        self._rehash()
+        return self._nodes[index]
+
+    def bucket(self, index):
+        return dict(self._leaves[index])
+
+    def differing_buckets(self, other):
+        """
+            Walks both trees from the root, descending only into the
+            nodes whose hashes differ.
+        """
+        if self.buckets != other.buckets:
+            raise ValueError('trees must have the same number of buckets')
+
+        differing = []
+        pending = [1]
+        while pending:
+            node = pending.pop()
+            if self.node(node) == other.node(node):
+                continue
+            if node >= self.buckets:
+                differing.append(node - self.buckets)
+            else:
+                pending.extend((2 * node, 2 * node + 1))
+        return sorted(differing)
+
+    def diff(self, other):
+        """
+            Returns the keys added, changed and removed going from this
+            tree to other.
+        """
+        added, changed, removed = [], [], []
+        for index in self.differing_buckets(other):
+            mine, theirs = self._leaves[index], other.bucket(index)
+            added.extend(key for key in theirs if key not in mine)
+            removed.extend(key for key in mine if key not in theirs)
+            changed.extend(key for key, value in mine.items()
+                           if key in theirs and theirs[key] != value)
+        return added, changed, removed
+
+    def __len__(self):
+        return sum(len(leaf) for leaf in self._leaves)
@@ -0,0 +1,142 @@
+from collections import Counter, defaultdict
+
+from kong.fingerprints import fingerprint
+
+COLLECTIONS = frozenset(['apis', 'consumers', 'plugins', 'services', 'routes',
+                         'upstreams', 'targets'])
+
+# seconds assumed for an endpoint with no recorded calls
+DEFAULT_LATENCY = 0.05
+
+
+def endpoint_key(method, url):
+    """
+        Groups the urls of one kind of call, e.g. every PATCH to a service
+        is ('PATCH', 'services').
+    """
+    from urllib3.util import parse_url
+
+    segments = [segment for segment in (parse_url(url).path or '').split('/')
+                if segment in COLLECTIONS]
+    return method.upper(), '/'.join(segments)
+
+
+class LatencyStats:
+    """
+        Mean latency per endpoint, fed from recorded calls or the spans of
+        a tracing collector.
+    """
+
+    def __init__(self):
+        self._totals = defaultdict(float)
+        self._counts = Counter()
+
+    @classmethod
+    def from_spans(cls, spans):
+        stats = cls()
+        for span in spans:
+            if span.name.startswith('HTTP ') and span.duration is not None:
+                stats.add(span.attributes['method'], span.attributes['url'], span.duration)
+        return stats
+
+    def add(self, method, url, seconds):
+        key = endpoint_key(method, url)
+        self._totals[key] += seconds
+        self._counts[key] += 1
+
+    def mean(self, method, url):
+        key = endpoint_key(method, url)
+        count = self._counts[key]
+        return self._totals[key] / count if count else None
+
+    def count(self, method, url):
+        return self._counts[endpoint_key(method, url)]
+
+
+class PlannedOperation:
+
+    def __init__(self, method, url, payload=None):
+        self.method = method
+        self.url = url
+        self.payload = payload
+        self.estimate = None
+        self.dropped = False
+
+    def as_dict(self):
+        return {'method': self.method, 'url': self.url, 'payload': self.payload,
+                'estimate': self.estimate}
+
+    def __repr__(self):
+        return 'PlannedOperation(%s %s)' % (self.method.upper(), self.url)
+
+
+class Plan:
+    """
+        Writes recorded instead of sent. Successive PATCHes to one url are
+        merged into the first, a DELETE drops the pending PATCHes to its
+        url and repeated identical calls are recorded once.
+    """
+
+    def __init__(self):
+        self._operations = []
+        self._posts = {}
+        self._pending = {}
+        self.coalesced = 0
+
+    @property
+    def operations(self):
+        return [operation for operation in self._operations if not operation.dropped]
+
+    def record(self, method, url, payload=None):
+        if method == 'post':
+            key = url, fingerprint(payload or {})
+            operation = self._posts.get(key)
+            if operation is None:
+                operation = self._posts[key] = self._append(method, url, payload)
+            else:
+                self.coalesced += 1
+            return operation
+
+        pending = self._pending.get(url)
+        if pending is not None:
+            if pending.method == method == 'patch':
+                pending.payload.update(payload)
+                self.coalesced += 1
+                return pending
+
+            if pending.method == method == 'delete':
+                self.coalesced += 1
+                return pending
+
+            if pending.method == 'patch' and method == 'delete':
+                pending.dropped = True
+                self.coalesced += 1
+
+        operation = self._pending[url] = self._append(method, url, payload)
+        return operation
+
+    def _append(self, method, url, payload):
+        operation = PlannedOperation(method, url, dict(payload) if payload else payload)
+        self._operations.append(operation)
+        return operation
+
+    def estimate(self, stats=None, default=DEFAULT_LATENCY):
+        """
+            Annotates every operation with its expected latency and returns
+            the total in seconds, as if they were sent one after the other.
+        """
+        total = 0.
+        for operation in self.operations:
+            mean = stats.mean(operation.method, operation.url) if stats is not None else None
+            operation.estimate = mean if mean is not None else default
+            total += operation.estimate
+        return total
+
+    def summary(self):
+        return Counter(operation.method.upper() for operation in self.operations)
+
+    def __len__(self):
+        return len(self.operations)
+
+    def __iter__(self):
+        return iter(self.operations)
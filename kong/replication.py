@@ -0,0 +1,183 @@
+import queue
+import threading
+
+# dependencies first, so every reference is mapped before it is needed
+ENTITY_TYPES = ('services', 'routes', 'apis', 'consumers', 'upstreams', 'targets', 'plugins')
+
+GENERATED_FIELDS = ('id', 'created_at', 'updated_at')
+
+# fields holding the id of another entity
+REFERENCES = {
+    'plugins': ('service_id', 'route_id', 'api_id', 'consumer_id'),
+    'targets': ('upstream_id',),
+}
+
+_DONE = object()
+
+
+def _is_none(value):
+    return value is None
+
+
+class ReplicationReport:  # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = []
+
+    def __repr__(self):
+        return 'ReplicationReport(created=%d, updated=%d, failed=%d)' \
+               % (self.created, self.updated, len(self.failed))
+
+
+class TargetWriter(threading.Thread):
+    """
+        Applies the entities queued for one target cluster in order,
+        mapping the ids of the source to the ones Kong generated there.
+    """
+
+    def __init__(self, kong_admin_client, queue_size=1000):
+        super(TargetWriter, self).__init__(daemon=True)
+        self._client = kong_admin_client
+        self.queue = queue.Queue(queue_size)
+        self.ids = {}
+        self.report = ReplicationReport()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                return
+            entity_type, entity = item
+            try:
+                self.apply(entity_type, entity)
+            except Exception as error:  # pylint: disable=broad-except
+                self.report.failed.append((entity_type, entity.get('id'), error))
+
+    def apply(self, entity_type, entity):
+        # pylint: disable=protected-access
+        client = getattr(self._client, entity_type)
+        payload = self._payload(entity_type, entity)
+
+        endpoint = None
+        if entity_type == 'targets':
+            endpoint = self._client.url + client._path % payload.pop('upstream_id')
+
+        try:
+            created = client._send_create(payload, endpoint=endpoint)
+            self.report.created += 1
+        except NameError:
+            existing_id = self._find_existing(entity_type, payload)
+            if existing_id is None:
+                raise
+            created = client._send_update(existing_id, payload, endpoint=endpoint)
+            self.report.updated += 1
+
+        self.ids[entity['id']] = created['id']
+
+    def _payload(self, entity_type, entity):
+        payload = {field: value for field, value in entity.items()
+                   if field not in GENERATED_FIELDS and value is not None}
+
+        for field in REFERENCES.get(entity_type, ()):
+            if field in payload:
+                payload[field] = self._map(payload[field])
+
+        if entity_type == 'routes' and payload.get('service'):
+            payload['service'] = {'id': self._map(payload['service']['id'])}
+
+        return payload
+
+    def _map(self, source_id):
+        try:
+            return self.ids[source_id]
+        except KeyError:
+            raise KeyError('unreplicated reference: %s' % source_id)
+
+    def _find_existing(self, entity_type, payload):
+        # pylint: disable=protected-access
+        client = getattr(self._client, entity_type)
+
+        if entity_type in ('services', 'apis', 'upstreams') and payload.get('name'):
+            return client._perform_retrieve(payload['name'])['id']
+
+        if entity_type == 'consumers':
+            if payload.get('username'):
+                return client._perform_retrieve(payload['username'])['id']
+            matches = client.filter(custom_id=payload.get('custom_id'))
+        elif entity_type == 'plugins':
+            scope = {field: payload.get(field, _is_none) for field in REFERENCES['plugins']}
+            matches = client.filter(name=payload['name'], **scope)
+        else:
+            return None
+
+        for match in matches:
+            return match.id
+        return None
+
+
+class Replicator:  # pylint: disable=too-few-public-methods
+    """
+        Streams the entities of a source cluster and applies them to every
+        target concurrently. Each target has its own writer thread and
+        bounded queue: the source is paged no faster than the slowest
+        target writes, and no target waits for another.
+
+        Kong generates new ids on creation, so references (the service of
+        a route, the scope of a plugin, the upstream of a target) are
+        mapped per target. Entities already present by name are updated.
+    """
+
+    def __init__(self, source, targets, entity_types=ENTITY_TYPES, page_size=1000,
+                 queue_size=1000):
+        for entity_type in entity_types:
+            if entity_type not in ENTITY_TYPES:
+                raise KeyError('invalid entity type: %s' % entity_type)
+        if 'targets' in entity_types and 'upstreams' not in entity_types:
+            raise ValueError('targets can only be replicated along with their upstreams')
+
+        self._source = source
+        self._targets = list(targets)
+        self.entity_types = [entity_type for entity_type in ENTITY_TYPES
+                             if entity_type in entity_types]
+        self.page_size = page_size
+        self.queue_size = queue_size
+
+    def _stream(self):
+        # pylint: disable=protected-access
+        upstream_ids = []
+        for entity_type in self.entity_types:
+            if entity_type == 'targets':
+                for upstream_id in upstream_ids:
+                    for target in self._source.targets._perform_list(upstream_id,
+                                                                     self.page_size):
+                        target.setdefault('upstream_id', upstream_id)
+                        yield entity_type, target
+                continue
+
+            for entity in getattr(self._source, entity_type)._perform_list(self.page_size):
+                if entity_type == 'upstreams':
+                    upstream_ids.append(entity['id'])
+                yield entity_type, entity
+
+    def run(self):
+        """
+            Replicates everything and returns a ReplicationReport per target,
+            in the order the targets were given.
+        """
+        writers = [TargetWriter(target, self.queue_size) for target in self._targets]
+        for writer in writers:
+            writer.start()
+
+        try:
+            for item in self._stream():
+                for writer in writers:
+                    writer.queue.put(item)
+        finally:
+            for writer in writers:
+                writer.queue.put(_DONE)
+            for writer in writers:
+                writer.join()
+
+        return [writer.report for writer in writers]
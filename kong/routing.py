@@ -0,0 +1,446 @@
+import re
+from collections import namedtuple
+
+from kong.structures import ApiData
+
+REGEX_PATH_CHARACTERS = re.compile(r'[^a-zA-Z0-9.\-_~/%]')
+
+Match = namedtuple('Match', ['entity', 'path', 'priority'])
+
+_ALWAYS = re.compile('')
+
+# backreferences and conditionals, which joining patterns would renumber
+_GROUP_REFERENCES = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def is_regex_path(path):
+    return REGEX_PATH_CHARACTERS.search(path) is not None
+
+
+def compile_path(path):
+    # Kong uses PCRE, which spells named groups (?<name>...)
+    return re.compile(re.sub(r'\(\?<(?=[A-Za-z_])', '(?P<', path))
+
+
+def _wildcard_host_pattern(host):
+    return '^%s$' % re.escape(host).replace(r'\*', '.+')
+
+
+class PrefixTrie:
+
+    def __init__(self):
+        self._root = ({}, [])
+
+    def insert(self, key, value):
+        node = self._root
+        for char in key:
+            children = node[0]
+            child = children.get(char)
+            if child is None:
+                child = children[char] = ({}, [])
+            node = child
+        node[1].append(value)
+
+    def prefixes_of(self, string):
+        """
+            Yields (prefix, value) for every inserted key that is a prefix of
+            string, longest prefixes last.
+        """
+        node = self._root
+        for value in node[1]:
+            yield '', value
+        for position, char in enumerate(string):
+            node = node[0].get(char)
+            if node is None:
+                return
+            for value in node[1]:
+                yield string[:position + 1], value
+
+    def with_prefix(self, prefix):
+        """
+            Yields (key, value) for every inserted key starting with prefix.
+        """
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return
+
+        pending = [(prefix, node)]
+        while pending:
+            key, node = pending.pop()
+            for value in node[1]:
+                yield key, value
+            for char, child in node[0].items():
+                pending.append((key + char, child))
+
+
+class CompiledRoute:  # pylint: disable=too-many-instance-attributes
+    """
+        Matching attributes of a RouteData or ApiData, normalized once.
+    """
+
+    def __init__(self, entity, order=0):
+        self.entity = entity
+        self.order = order
+
+        is_api = isinstance(entity, ApiData)
+        hosts = getattr(entity, 'hosts', None) or []
+        paths = getattr(entity, 'uris' if is_api else 'paths', None) or []
+        methods = getattr(entity, 'methods', None) or []
+
+        hosts = [host.lower() for host in hosts]
+        self.plain_hosts = frozenset(host for host in hosts if '*' not in host)
+        self.wildcard_hosts = tuple(re.compile(_wildcard_host_pattern(host))
+                                    for host in hosts if '*' in host)
+
+        self.prefix_paths = tuple(path for path in paths if not is_regex_path(path))
+        self.regex_paths = tuple((path, compile_path(path))
+                                 for path in paths if is_regex_path(path))
+
+        self.methods = frozenset(method.upper() for method in methods)
+
+        if is_api:
+            protocols = ['https'] if getattr(entity, 'https_only', False) \
+                else ['http', 'https']
+        else:
+            protocols = getattr(entity, 'protocols', None) or ['http', 'https']
+        self.protocols = frozenset(protocols)
+
+        self.regex_priority = getattr(entity, 'regex_priority', None) or 0
+        self.created_at = getattr(entity, 'created_at', None) or 0
+        self.categories = bool(hosts) + bool(paths) + bool(methods)
+
+    @property
+    def has_hosts(self):
+        return bool(self.plain_hosts or self.wildcard_hosts)
+
+    @property
+    def has_paths(self):
+        return bool(self.prefix_paths or self.regex_paths)
+
+    def match_host(self, host):
+        if not self.has_hosts:
+            return 2
+        if host in self.plain_hosts:
+            return 0
+        for pattern in self.wildcard_hosts:
+            if pattern.match(host):
+                return 1
+        return None
+
+    def match_path(self, path):
+        """
+            Returns the (path, priority) of the best path of this route
+            matching the given request path, or None.
+        """
+        if not self.has_paths:
+            return None, (2, 0)
+        for regex_path, pattern in self.regex_paths:
+            if pattern.match(path):
+                return regex_path, (0, -self.regex_priority)
+        best = None
+        for prefix in self.prefix_paths:
+            if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        if best is None:
+            return None
+        return best, (1, -len(best))
+
+    def match(self, method, host, path, protocol):
+        if protocol not in self.protocols:
+            return None
+        if self.methods and method not in self.methods:
+            return None
+        host_priority = self.match_host(host)
+        if host_priority is None:
+            return None
+        path_match = self.match_path(path)
+        if path_match is None:
+            return None
+        matched_path, path_priority = path_match
+        priority = (-self.categories, host_priority) + path_priority \
+            + (self.created_at, self.order)
+        return Match(self.entity, matched_path, priority)
+
+
+class PathIndex:
+    """
+        Routes sharing a host bucket, indexed by their paths: prefix paths in
+        a trie and regex paths behind a single combined automaton.
+    """
+
+    def __init__(self):
+        self._by_prefix = PrefixTrie()
+        self._by_regex = []
+        self._any_regex = None
+        self._pathless = []
+
+    def add(self, compiled):
+        if not compiled.has_paths:
+            self._pathless.append(compiled)
+            return
+        for prefix in compiled.prefix_paths:
+            self._by_prefix.insert(prefix, compiled)
+        if compiled.regex_paths:
+            self._by_regex.append(compiled)
+
+    def compile(self):
+        self._by_regex.sort(key=lambda compiled: -compiled.regex_priority)
+        self._any_regex = self._combine_regex_paths()
+
+    def _combine_regex_paths(self):
+        """
+            Single automaton used to discard every regex route at once when
+            none of their paths match the request.
+        """
+        patterns = [pattern.pattern for compiled in self._by_regex
+                    for _, pattern in compiled.regex_paths]
+        if not patterns:
+            return None
+        if any(_GROUP_REFERENCES.search(pattern) for pattern in patterns):
+            return _ALWAYS
+        # group names may repeat across routes, so they are dropped
+        combined = '|'.join('(?:%s)' % re.sub(r'\(\?P<\w+>', '(', pattern)
+                            for pattern in patterns)
+        try:
+            return re.compile(combined)
+        except re.error:
+            return _ALWAYS
+
+    def candidates(self, path, found):
+        for _, compiled in self._by_prefix.prefixes_of(path):
+            found.append(compiled)
+        if self._any_regex is not None and self._any_regex.match(path):
+            found.extend(self._by_regex)
+        found.extend(self._pathless)
+
+
+class Router:
+    """
+        Offline approximation of Kong 0.13 request routing over fetched
+        RouteData and ApiData.
+
+        Routes are bucketed once by plain host, and inside every bucket by
+        path, so a lookup only verifies the few routes that can possibly
+        match. Between matching routes, those with more matching attributes
+        win, then plain hosts over wildcards, regex paths by regex_priority
+        over prefix paths by length, and finally the oldest route.
+    """
+
+    def __init__(self, routes=(), apis=()):
+        self.compiled = [CompiledRoute(entity, order)
+                         for order, entity in enumerate(list(routes) + list(apis))]
+
+        self._by_host = {}
+        self._hostless = PathIndex()
+
+        for compiled in self.compiled:
+            if compiled.plain_hosts:
+                for host in compiled.plain_hosts:
+                    self._by_host.setdefault(host, PathIndex()).add(compiled)
+            if not compiled.plain_hosts or compiled.wildcard_hosts:
+                self._hostless.add(compiled)
+
+        self._hostless.compile()
+        for index in self._by_host.values():
+            index.compile()
+
+    @classmethod
+    def from_client(cls, kong_admin_client, size=1000):
+        return cls(routes=kong_admin_client.routes.list(size),
+                   apis=kong_admin_client.apis.list(size))
+
+    def _matching(self, method, host, path, protocol):
+        method = method.upper()
+        host = host.lower().split(':', 1)[0]
+
+        candidates = []
+        index = self._by_host.get(host)
+        if index is not None:
+            index.candidates(path, candidates)
+        self._hostless.candidates(path, candidates)
+
+        found = {}
+        for compiled in candidates:
+            if compiled.order in found:
+                continue
+            result = compiled.match(method, host, path, protocol)
+            if result is not None:
+                found[compiled.order] = result
+        return found.values()
+
+    def matches(self, method, host, path, protocol='http'):
+        """
+            Returns every Match for the request, best first.
+        """
+        return sorted(self._matching(method, host, path, protocol),
+                      key=lambda result: result.priority)
+
+    def match(self, method, host, path, protocol='http'):
+        """
+            Returns the RouteData or ApiData Kong would route the request to,
+            or None.
+        """
+        found = self._matching(method, host, path, protocol)
+        if not found:
+            return None
+        return min(found, key=lambda result: result.priority).entity
+
+
+Conflict = namedtuple('Conflict', ['kind', 'entity', 'others'])
+
+_REGEX_SPECIAL_CHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+def literal_prefix(pattern):
+    """
+        Longest literal string every match of the regex starts with.
+    """
+    prefix = []
+    for char in pattern:
+        if char in _REGEX_SPECIAL_CHARACTERS:
+            if char in '*?{' and prefix:
+                prefix.pop()
+            break
+        prefix.append(char)
+    return ''.join(prefix)
+
+
+_ASSERTIONS = re.compile(r'\\.|\$|\(\?<?[=!]')
+
+
+def is_bounded(pattern):
+    """
+        Whether the regex has an end anchor, a word boundary or a
+        lookaround, after which matching its literal prefix no longer
+        implies matching every path under it.
+    """
+    for token in _ASSERTIONS.findall(pattern):
+        if token in ('\\Z', '\\b', '\\B') or not token.startswith('\\'):
+            return True
+    return False
+
+
+class ConflictAnalyzer:
+    """
+        Finds routes and apis that Kong can never route a request to
+        (shadowed) and those that tie with others for some request, making
+        the winner depend on creation order (ambiguous). Prefix paths only
+        partly taken by an anchored regex are reported as overlapping.
+
+        Every route is expanded into atoms, one per (protocol, host, method,
+        path) combination. Identical atoms are found by hashing, and regex
+        paths, which Kong tries before prefix paths, are only tested against
+        the prefix paths below their literal prefix in a per scope trie, so
+        no pairwise comparison of routes is ever needed.
+    """
+
+    def __init__(self, routes=(), apis=()):
+        self.compiled = [CompiledRoute(entity, order)
+                         for order, entity in enumerate(list(routes) + list(apis))]
+
+    @classmethod
+    def from_client(cls, kong_admin_client, size=1000):
+        return cls(routes=kong_admin_client.routes.list(size),
+                   apis=kong_admin_client.apis.list(size))
+
+    @staticmethod
+    def _atoms(compiled):
+        hosts = sorted(compiled.plain_hosts) \
+            + [pattern.pattern for pattern in compiled.wildcard_hosts] or [None]
+        methods = sorted(compiled.methods) or [None]
+        paths = [(path, None) for path in compiled.prefix_paths] \
+            + list(compiled.regex_paths) or [(None, None)]
+
+        for protocol in sorted(compiled.protocols):
+            for host in hosts:
+                for method in methods:
+                    for path, pattern in paths:
+                        yield (protocol, host, method, path), pattern
+
+    def conflicts(self):
+        atoms_by_key = {}
+        regex_atoms = []
+        atom_keys = {}
+
+        for compiled in self.compiled:
+            keys = atom_keys[compiled.order] = set()
+            for key, pattern in self._atoms(compiled):
+                if key in keys:
+                    continue
+                keys.add(key)
+                if pattern is None:
+                    priority = (1 if key[3] is not None else 2, 0)
+                else:
+                    priority = (0, -compiled.regex_priority)
+                    regex_atoms.append((key, pattern, compiled))
+                atoms_by_key.setdefault(key, []).append((priority, compiled))
+
+        lost = {}
+        ties = {}
+        overlaps = {}
+
+        for key, owners in atoms_by_key.items():
+            if len(owners) > 1:
+                self._resolve(key, owners, lost, ties)
+
+        tries = self._prefix_tries(atoms_by_key)
+        for key, pattern, compiled in regex_atoms:
+            trie = tries.get(key[:3])
+            if trie is not None:
+                self._shadow_prefixes(trie, pattern, compiled,
+                                      overlaps if is_bounded(pattern.pattern) else lost)
+
+        return self._report(atom_keys, lost, ties, overlaps)
+
+    @staticmethod
+    def _prefix_tries(atoms_by_key):
+        # one trie of prefix paths per (protocol, host, method) scope
+        tries = {}
+        for key, owners in atoms_by_key.items():
+            path = key[3]
+            if path is not None and not is_regex_path(path):
+                tries.setdefault(key[:3], PrefixTrie()).insert(path, (key, owners))
+        return tries
+
+    @staticmethod
+    def _resolve(key, owners, lost, ties):
+        best = min(priority for priority, _ in owners)
+        winners = [compiled for priority, compiled in owners if priority == best]
+        for priority, compiled in owners:
+            if priority != best:
+                lost.setdefault(compiled.order, {}).setdefault(key, set()).update(
+                    winner.order for winner in winners)
+            elif len(winners) > 1:
+                ties.setdefault(compiled.order, set()).update(
+                    winner.order for winner in winners if winner is not compiled)
+
+    @staticmethod
+    def _shadow_prefixes(trie, pattern, compiled, lost):
+        for path, (key, owners) in trie.with_prefix(literal_prefix(pattern.pattern)):
+            if pattern.match(path):
+                for _, owner in owners:
+                    if owner is not compiled:
+                        lost.setdefault(owner.order, {}).setdefault(key, set()).add(
+                            compiled.order)
+
+    def _report(self, atom_keys, lost, ties, overlaps):
+        by_order = {compiled.order: compiled.entity for compiled in self.compiled}
+        conflicts = []
+
+        for order in sorted(set(lost) | set(ties) | set(overlaps)):
+            lost_atoms = lost.get(order, {})
+            if lost_atoms and len(lost_atoms) == len(atom_keys[order]):
+                shadowing = sorted(set().union(*lost_atoms.values()))
+                conflicts.append(Conflict('shadowed', by_order[order],
+                                          [by_order[other] for other in shadowing]))
+            elif order in overlaps:
+                overlapping = sorted(set().union(*overlaps[order].values()))
+                conflicts.append(Conflict('overlapping', by_order[order],
+                                          [by_order[other] for other in overlapping]))
+            if order in ties:
+                conflicts.append(Conflict('ambiguous', by_order[order],
+                                          [by_order[other] for other in sorted(ties[order])]))
+
+        return conflicts
@@ -0,0 +1,149 @@
+import threading
+import time
+from array import array
+
+GAUGES = ('connections_active', 'connections_reading', 'connections_writing',
+          'connections_waiting')
+COUNTERS = ('total_requests', 'connections_accepted', 'connections_handled')
+FIELDS = GAUGES + COUNTERS + ('database_reachable',)
+
+
+class RingBuffer:
+    """
+        The last capacity samples of one node: a timestamp array and one
+        integer array per field, allocated once and overwritten in place.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = {field: array('q', bytes(8 * capacity)) for field in FIELDS}
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp, status):
+        server = status.get('server', {})
+        head = self.head
+        self.times[head] = timestamp
+        for field in GAUGES + COUNTERS:
+            self.values[field][head] = server.get(field, 0)
+        self.values['database_reachable'][head] = \
+            1 if status.get('database', {}).get('reachable') else 0
+
+        self.head = (head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _ordered(self, values):
+        if self.count < self.capacity:
+            return values[:self.count]
+        return values[self.head:] + values[:self.head]
+
+    def series(self, field):
+        return self._ordered(self.times), self._ordered(self.values[field])
+
+
+def _percentile(ordered, percentile):
+    # nearest rank
+    rank = max(int(-(-percentile * len(ordered) // 100)), 1)
+    return ordered[rank - 1]
+
+
+class NodeStatusSampler:  # pylint: disable=too-many-instance-attributes
+    """
+        Polls status/ on every admin node each interval seconds into a
+        fixed size RingBuffer per node. Rates and percentiles are only
+        computed when asked for.
+
+        nodes is a list of clients, named by url, or a dict of name to
+        client. A failed poll is counted in errors and records nothing.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, nodes, interval=1., capacity=3600, sleep=None, clock=time.time):
+        if not isinstance(nodes, dict):
+            nodes = {client.url: client for client in nodes}
+        self.nodes = nodes
+        self.interval = interval
+        self.buffers = {name: RingBuffer(capacity) for name in nodes}
+        self.errors = {name: 0 for name in nodes}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sleep = sleep or self._stopped.wait
+        self._thread = None
+
+    def sample(self):
+        for name, client in self.nodes.items():
+            try:
+                status = client.node_status()
+            except Exception:  # pylint: disable=broad-except
+                self.errors[name] += 1
+                continue
+            with self._lock:
+                self.buffers[name].append(self._clock(), status)
+
+    def run(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            self.sample()
+            if self._stopped.is_set():
+                break
+            self._sleep(max(0., self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        """
+            Samples in a daemon thread until stop() is called.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name='node-status-sampler',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def series(self, name, field):
+        """
+            Timestamps and values of a field, oldest first.
+        """
+        if field not in FIELDS:
+            raise KeyError('unknown field: %s' % field)
+        with self._lock:
+            return self.buffers[name].series(field)
+
+    def rates(self, name, field='total_requests'):
+        """
+            Per second increase of a counter between consecutive samples;
+            intervals where the counter went back (a restart) are skipped.
+        """
+        times, values = self.series(name, field)
+        return [(values[index] - values[index - 1]) / (times[index] - times[index - 1])
+                for index in range(1, len(values))
+                if values[index] >= values[index - 1] and times[index] > times[index - 1]]
+
+    def percentiles(self, name, field, percentiles=(50, 90, 99)):
+        """
+            Percentiles of a gauge's values or of a counter's rates.
+        """
+        samples = self.rates(name, field) if field in COUNTERS else self.series(name, field)[1]
+        ordered = sorted(samples)
+        if not ordered:
+            return {percentile: None for percentile in percentiles}
+        return {percentile: _percentile(ordered, percentile) for percentile in percentiles}
+
+    def export(self):
+        """
+            Every node's samples as plain lists, oldest first, ready to
+            be serialized.
+        """
+        exported = {}
+        with self._lock:
+            for name, buffer in self.buffers.items():
+                exported[name] = {'time': buffer.series(FIELDS[0])[0].tolist()}
+                for field in FIELDS:
+                    exported[name][field] = buffer.series(field)[1].tolist()
+        return exported
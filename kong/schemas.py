@@ -0,0 +1,175 @@
+import threading
+
+from kong.exceptions import SchemaViolation
+
+
+def _is_number(value):
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    if isinstance(value, str):
+        try:
+            float(value)
+        except ValueError:
+            return False
+        return True
+    return False
+
+
+def _is_boolean(value):
+    return isinstance(value, bool) or value in ('true', 'false')
+
+
+def _is_array(value):
+    return isinstance(value, (list, tuple, str))
+
+
+def _is_string(value):
+    return isinstance(value, str)
+
+
+def _is_table(value):
+    return isinstance(value, dict)
+
+
+# Kong coerces form encoded strings into the declared type, so do we
+TYPE_CHECKS = {
+    'number': _is_number,
+    'timestamp': _is_number,
+    'boolean': _is_boolean,
+    'array': _is_array,
+    'string': _is_string,
+    'url': _is_string,
+    'table': _is_table,
+}
+
+
+def compile_schema(schema):
+    """
+        Compiles a Kong 0.13 plugin schema (the body of
+        plugins/schema/<name>) into a function that takes a config dict and
+        returns a list of violations.
+    """
+    fields = schema.get('fields', {})
+    compiled = {name: _compile_field(name, spec) for name, spec in fields.items()}
+    required = tuple(name for name, spec in fields.items()
+                     if spec.get('required') and 'default' not in spec)
+
+    def validate(config, partial=False, prefix=''):
+        errors = []
+        config = config or {}
+        if not partial:
+            for name in required:
+                if config.get(name) is None:
+                    errors.append('%s%s: required field missing' % (prefix, name))
+        for name, value in config.items():
+            check = compiled.get(name)
+            if check is None:
+                errors.append('%s%s: unknown field' % (prefix, name))
+            elif value is not None:
+                check(value, partial, prefix, errors)
+        return errors
+
+    return validate
+
+
+def _compile_field(name, spec):
+    field_type = spec.get('type')
+    type_check = TYPE_CHECKS.get(field_type)
+    enum = frozenset(spec['enum']) if spec.get('enum') else None
+    nested = compile_schema(spec['schema']) \
+        if field_type == 'table' and isinstance(spec.get('schema'), dict) else None
+
+    def check(value, partial, prefix, errors):
+        if type_check is not None and not type_check(value):
+            errors.append('%s%s: expected a %s' % (prefix, name, field_type))
+            return
+        if enum is not None:
+            if field_type != 'array':
+                items = [value]
+            elif isinstance(value, str):
+                items = value.split(',')
+            else:
+                items = value
+            for item in items:
+                if item not in enum:
+                    errors.append('%s%s: "%s" is not allowed' % (prefix, name, item))
+        if nested is not None:
+            errors.extend(nested(value, partial, '%s%s.' % (prefix, name)))
+
+    return check
+
+
+class PluginSchemaRegistry:
+    """
+        Fetches every plugin schema once per Kong version and validates
+        plugin configs locally against it.
+    """
+
+    def __init__(self, kong_admin_client):
+        self._client = kong_admin_client
+        self._lock = threading.Lock()
+        self._version = None
+        self._enabled = {}
+        self._schemas = {}
+        self._validators = {}
+
+    @property
+    def version(self):
+        if self._version is None:
+            self.refresh_version()
+        return self._version
+
+    def refresh_version(self):
+        """
+            Fetches the node version, dropping cached schemas of any other
+            version.
+        """
+        version = self._client.node_information().get('version')
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._enabled = {}
+                self._schemas = {}
+                self._validators = {}
+        return version
+
+    def enabled(self):
+        version = self.version
+        if version not in self._enabled:
+            self._enabled[version] = list(self._client.plugins.retrieve_enabled())
+        return self._enabled[version]
+
+    def schema(self, plugin_name):
+        key = (self.version, plugin_name)
+        if key not in self._schemas:
+            try:
+                schema = self._client.plugins.retrieve_schema(plugin_name)
+            except NameError:
+                raise SchemaViolation('%s: unknown plugin' % plugin_name)
+            with self._lock:
+                self._schemas[key] = schema
+        return self._schemas[key]
+
+    def validator(self, plugin_name):
+        key = (self.version, plugin_name)
+        validator = self._validators.get(key)
+        if validator is None:
+            validator = compile_schema(self.schema(plugin_name))
+            with self._lock:
+                self._validators[key] = validator
+        return validator
+
+    def preload(self, plugin_names=None):
+        for plugin_name in plugin_names or self.enabled():
+            self.validator(plugin_name)
+
+    def errors(self, plugin_name, config, partial=False):
+        return self.validator(plugin_name)(config, partial)
+
+    def validate(self, plugin_name, config, partial=False):
+        errors = self.errors(plugin_name, config, partial)
+        if errors:
+            raise SchemaViolation('invalid %s config: %s' % (plugin_name, ', '.join(errors)))
+        return config
@@ -0,0 +1,159 @@
+import json
+import multiprocessing
+import struct
+import time
+from zlib import crc32
+
+MAGIC = b'KSHM'
+
+# magic, slots, slot size, stripes
+_HEADER = struct.Struct('<4sIII')
+# state, key length, value length, expiry (0 for never)
+_SLOT = struct.Struct('<BHId')
+
+EMPTY, USED, DELETED = 0, 1, 2
+
+
+class SharedMemoryCache:  # pylint: disable=too-many-instance-attributes
+    """
+        Fixed size hash table of json-serialized values in one shared
+        memory block, meant to be created by a pre-fork server before it
+        forks, so that every worker inherits the block and its locks.
+
+        Slots are split into stripes, each guarded by its own lock; a key
+        hashes to one stripe and is probed linearly inside it. A value
+        bigger than a slot is not cached; when a stripe is full around a
+        key, the key's home slot is overwritten.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, slots=65536, slot_size=2048, stripes=64, ttl=None, max_probe=16):
+        from multiprocessing import shared_memory
+
+        self.per_stripe = -(-slots // stripes)
+        self.slots = self.per_stripe * stripes
+        self.slot_size = slot_size
+        self.stripes = stripes
+        self.ttl = ttl
+        self.max_probe = min(max_probe, self.per_stripe)
+
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=_HEADER.size + self.slots * slot_size)
+        self._buffer = self._memory.buf
+        _HEADER.pack_into(self._buffer, 0, MAGIC, self.slots, slot_size, stripes)
+        self._locks = [multiprocessing.Lock() for _ in range(stripes)]
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    def _probe(self, key):
+        digest = crc32(key)
+        stripe = digest % self.stripes
+        base = stripe * self.per_stripe
+        home = (digest // self.stripes) % self.per_stripe
+        offsets = [_HEADER.size + (base + (home + step) % self.per_stripe) * self.slot_size
+                   for step in range(self.max_probe)]
+        return self._locks[stripe], offsets
+
+    def _matches(self, offset, key):
+        start = offset + _SLOT.size
+        return self._buffer[start:start + len(key)] == key
+
+    def get(self, key):
+        key = key.encode('utf-8')
+        lock, offsets = self._probe(key)
+        buffer = self._buffer
+
+        with lock:
+            for offset in offsets:
+                state, key_length, value_length, expires = _SLOT.unpack_from(buffer, offset)
+                if state == EMPTY:
+                    return None
+                if state != USED or key_length != len(key) or not self._matches(offset, key):
+                    continue
+                if expires and expires < time.time():
+                    _SLOT.pack_into(buffer, offset, DELETED, 0, 0, 0)
+                    return None
+                start = offset + _SLOT.size + key_length
+                value = bytes(buffer[start:start + value_length])
+                break
+            else:
+                return None
+
+        return json.loads(value.decode('utf-8'))
+
+    def set(self, key, value, ttl=None):
+        """
+            Returns False when the value does not fit in a slot.
+        """
+        key = key.encode('utf-8')
+        value = json.dumps(value, separators=(',', ':')).encode('utf-8')
+        if _SLOT.size + len(key) + len(value) > self.slot_size:
+            self.delete(key.decode('utf-8'))
+            return False
+
+        ttl = ttl if ttl is not None else self.ttl
+        expires = time.time() + ttl if ttl else 0
+        lock, offsets = self._probe(key)
+        buffer = self._buffer
+
+        with lock:
+            target = None
+            for offset in offsets:
+                state, key_length, _, _ = _SLOT.unpack_from(buffer, offset)
+                if state == USED and key_length == len(key) and self._matches(offset, key):
+                    target = offset
+                    break
+                if state != USED and target is None:
+                    target = offset
+                if state == EMPTY:
+                    break
+            if target is None:
+                target = offsets[0]
+
+            start = target + _SLOT.size
+            buffer[start:start + len(key)] = key
+            buffer[start + len(key):start + len(key) + len(value)] = value
+            _SLOT.pack_into(buffer, target, USED, len(key), len(value), expires)
+        return True
+
+    def delete(self, key):
+        key = key.encode('utf-8')
+        lock, offsets = self._probe(key)
+        buffer = self._buffer
+
+        with lock:
+            for offset in offsets:
+                state, key_length, _, _ = _SLOT.unpack_from(buffer, offset)
+                if state == EMPTY:
+                    return
+                if state == USED and key_length == len(key) and self._matches(offset, key):
+                    _SLOT.pack_into(buffer, offset, DELETED, 0, 0, 0)
+                    return
+
+    def warm(self, client, page_size=1000):
+        """
+            Lists a client's entities into the cache under the urls its
+            retrieve() would request, by each field Kong retrieves it by.
+        """
+        # pylint: disable=protected-access
+        endpoint = client.endpoint
+        key_fields = client._cache_key_fields
+        count = 0
+        for entity in client._perform_list(page_size):
+            for field in key_fields:
+                if entity.get(field) is not None:
+                    self.set(endpoint + str(entity[field]), entity)
+            count += 1
+        return count
+
+    def close(self):
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self):
+        """
+            Frees the block; called once, by the process that created it.
+        """
+        self._memory.unlink()
@@ -0,0 +1,103 @@
+import asyncio
+import copy
+import threading
+
+
+class _Call:  # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+        Runs at most one call per key at a time: callers arriving while a
+        call is in flight wait for it and get its result (or its error)
+        instead of making their own.
+
+        Waiters get a copy of the result, so none can alter what another
+        one sees.
+    """
+
+    def __init__(self, copy_result=copy.deepcopy):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._copy = copy_result
+
+    def do(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self._copy(call.result)
+
+        result = None
+        try:
+            result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # the waiters copy a snapshot, the leader may change its result
+            if call.waiters and call.error is None:
+                call.result = self._copy(result)
+            call.done.set()
+
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+        SingleFlight for coroutine functions running on one event loop.
+    """
+
+    def __init__(self, copy_result=copy.deepcopy):
+        self._futures = {}
+        self._waiters = {}
+        self._copy = copy_result
+
+    async def do(self, key, coroutine_function):
+        future = self._futures.get(key)
+        if future is not None:
+            self._waiters[key] += 1
+            return self._copy(await asyncio.shield(future))
+
+        future = self._futures[key] = asyncio.get_event_loop().create_future()
+        self._waiters[key] = 0
+        try:
+            result = await coroutine_function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # retrieved here so that an error nobody waited for is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(self._copy(result) if self._waiters[key] else result)
+        finally:
+            del self._futures[key]
+            del self._waiters[key]
+
+        return result
+
+    def in_flight(self):
+        return len(self._futures)
@@ -0,0 +1,171 @@
+import json
+import mmap
+import struct
+
+from kong.fingerprints import canonical
+
+MAGIC = b'KSNP'
+VERSION = 1
+
+KEY_FIELDS = ('id', 'name', 'username', 'custom_id')
+
+# magic, version, offset of the json header
+_PREAMBLE = struct.Struct('<4sIQ')
+# offset and length of a record
+_RECORD = struct.Struct('<QI')
+# offset and length of a key, number of its record
+_ENTRY = struct.Struct('<QII')
+
+
+def _write_index(snapshot, offset, field_keys):
+    # the sorted keys, then an entry per key pointing at it and its record
+    field_keys.sort()
+    entries = []
+    keys_offset = offset
+    for key, number in field_keys:
+        entries.append(_ENTRY.pack(offset, len(key), number))
+        offset += len(key)
+    snapshot.write(b''.join(key for key, _ in field_keys))
+    index = {'keys': keys_offset, 'entries': offset, 'count': len(entries)}
+    offset += snapshot.write(b''.join(entries))
+    return index, offset
+
+
+def write_snapshot(path, entities, key_fields=KEY_FIELDS):
+    """
+        Writes entity dicts to a snapshot file, with a sorted index over
+        each of the key fields. Records are streamed to disk; only their
+        positions and keys are held in memory.
+
+        Layout: preamble, records, record table, then per index the keys
+        and the sorted entries, and a json header at the end.
+    """
+    records = []
+    keys = {field: [] for field in key_fields}
+
+    with open(path, 'wb') as snapshot:
+        offset = snapshot.write(_PREAMBLE.pack(MAGIC, VERSION, 0))
+
+        for number, entity in enumerate(entities):
+            body = canonical(entity)
+            records.append(_RECORD.pack(offset, len(body)))
+            offset += snapshot.write(body)
+            for field in key_fields:
+                value = entity.get(field)
+                if value is not None:
+                    keys[field].append((str(value).encode('utf-8'), number))
+
+        header = {'count': len(records), 'records': offset, 'indexes': {}}
+        offset += snapshot.write(b''.join(records))
+
+        for field, field_keys in keys.items():
+            header['indexes'][field], offset = _write_index(snapshot, offset, field_keys)
+
+        snapshot.write(json.dumps(header).encode('utf-8'))
+        snapshot.seek(0)
+        snapshot.write(_PREAMBLE.pack(MAGIC, VERSION, offset))
+
+    return len(records)
+
+
+class Snapshot:
+    """
+        Read-only, memory-mapped view of a snapshot file: opening it only
+        reads the header, lookups binary search the sorted index of a
+        field and decode nothing but the matching records.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError('invalid snapshot: %s' % path)
+
+        try:
+            magic, version, header_offset = _PREAMBLE.unpack_from(self._map)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('invalid snapshot: %s' % path)
+
+        header = json.loads(self._map[header_offset:].decode('utf-8'))
+        self._count = header['count']
+        self._records = header['records']
+        self._indexes = header['indexes']
+
+    @property
+    def key_fields(self):
+        return tuple(self._indexes)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, number):
+        if not 0 <= number < self._count:
+            raise IndexError('record out of range: %s' % number)
+        offset, length = _RECORD.unpack_from(self._map, self._records + number * _RECORD.size)
+        return json.loads(self._map[offset:offset + length].decode('utf-8'))
+
+    def __iter__(self):
+        for number in range(self._count):
+            yield self[number]
+
+    def _index(self, field):
+        try:
+            return self._indexes[field]
+        except KeyError:
+            raise KeyError('not indexed: %s' % field)
+
+    def _entry(self, index, position):
+        key_offset, key_length, number = _ENTRY.unpack_from(
+            self._map, index['entries'] + position * _ENTRY.size)
+        return self._map[key_offset:key_offset + key_length], number
+
+    def _bisect(self, index, key):
+        low, high = 0, index['count']
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(index, middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, field, value, default=None):
+        index = self._index(field)
+        key = str(value).encode('utf-8')
+        position = self._bisect(index, key)
+        if position < index['count']:
+            found, number = self._entry(index, position)
+            if found == key:
+                return self[number]
+        return default
+
+    def range(self, field, start=None, stop=None):
+        """
+            Yields the records whose field is within [start, stop), in key
+            order.
+        """
+        index = self._index(field)
+        position = 0 if start is None else self._bisect(index, str(start).encode('utf-8'))
+        stop = None if stop is None else str(stop).encode('utf-8')
+        while position < index['count']:
+            key, number = self._entry(index, position)
+            if stop is not None and key >= stop:
+                return
+            yield self[number]
+            position += 1
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
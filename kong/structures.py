@@ -1,46 +1,113 @@
-from abc import abstractmethod
-
-import re
-from urllib3.util import parse_url, Url
+from collections import namedtuple
+from functools import lru_cache
 
 from kong.exceptions import SchemaViolation
 
+Violation = namedtuple('Violation', ['row', 'error'])
+
+VALUE_TYPES = (str, int, bool, list, dict, None.__class__)
+
 
 class ObjectData:
+    """
+        Subclasses describe their schema declaratively; the rules are
+        compiled into a single validator function the first time each class
+        is used.
+    """
+
+    allowed_parameters = ()
+
+    # every one of them must be provided
+    obligatory_parameters = ()
+    obligatory_message = '%(parameter)s must be provided to _perform_create'
+
+    # at least one of them must be provided
+    semi_optional_parameters = ()
+    semi_optional_message = None
+
+    # (parameter, value, dependant, message): dependant must be provided
+    # when parameter is set to value
+    conditional_parameters = ()
 
     def __init__(self, **kwargs):
 
         validated = self.validate_schema(**kwargs)
 
-        for k, val in validated.items():
-            self.validate_parameter(k, val)
-            self.__setattr__(k, val)
+        self.__dict__.update(validated)
 
-    @abstractmethod
-    def validate_obligatory_parameters(self, **kwargs):
-        pass
+    @classmethod
+    def normalize_parameters(cls, kwargs):
+        return kwargs
 
-    @abstractmethod
-    def validate_semi_optional_parameters(self, **kwargs):  # pylint:disable=invalid-name
-        pass
+    @classmethod
+    def schema_errors(cls, kwargs):
+        validator = cls.__dict__.get('_validator')
+        if validator is None:
+            validator = cls._compile_validator()
+            cls._validator = validator
+        return validator(kwargs)
+
+    @classmethod
+    def _compile_validator(cls):
+        allowed = frozenset(cls.allowed_parameters)
+        obligatory = tuple(cls.obligatory_parameters)
+        obligatory_message = cls.obligatory_message
+        semi_optional = tuple(cls.semi_optional_parameters)
+        semi_optional_message = cls.semi_optional_message
+        conditionals = tuple(cls.conditional_parameters)
+
+        def validator(kwargs):
+            errors = []
+
+            for parameter in obligatory:
+                if parameter not in kwargs:
+                    errors.append(SchemaViolation(obligatory_message
+                                                  % {'parameter': parameter}))
+
+            if semi_optional and not any(parameter in kwargs for parameter in semi_optional):
+                errors.append(SchemaViolation(semi_optional_message))
+
+            for parameter, value, dependant, message in conditionals:
+                if parameter in kwargs and dependant not in kwargs \
+                        and str(kwargs[parameter]).lower() == value:
+                    errors.append(SchemaViolation(message))
+
+            for parameter, value in kwargs.items():
+                if parameter not in allowed:
+                    errors.append(SchemaViolation('invalid parameter: %s' % parameter))
+                elif not isinstance(value, VALUE_TYPES):
+                    errors.append(ValueError('invalid value: %s value must be str, int, '
+                                             'bool, _perform_list or dict' % parameter))
+
+            return errors
+
+        return validator
 
     def validate_schema(self, **kwargs):
-        self.validate_obligatory_parameters(**kwargs)
-        self.validate_semi_optional_parameters(**kwargs)
+        kwargs = self.normalize_parameters(kwargs)
+        errors = self.schema_errors(kwargs)
+        if errors:
+            raise errors[0]
         return kwargs
 
-    @property
-    @abstractmethod
-    def allowed_parameters(self):
-        pass
-
-    def validate_parameter(self, parameter, value):
-        if parameter not in self.allowed_parameters:
-            raise SchemaViolation('invalid parameter: %s' % parameter)
-
-        if not isinstance(value, (str, int, bool, list, dict, None.__class__)):
-            raise ValueError('invalid value: %s value must be str, int, '
-                             'bool, _perform_list or dict' % parameter)
+    @classmethod
+    def validate_many(cls, list_of_dicts):
+        """
+            Validates every dict without building any object and returns a
+            Violation for each problem found.
+        """
+        normalize = cls.normalize_parameters
+        schema_errors = cls.schema_errors
+        violations = []
+        for row, kwargs in enumerate(list_of_dicts):
+            try:
+                kwargs = normalize(dict(kwargs))
+            except (SchemaViolation, ValueError) as error:
+                violations.append(Violation(row, error))
+                continue
+            for error in schema_errors(kwargs):
+                violations.append(Violation(row, error))
+        return violations
 
     def as_dict(self):
         return self.__dict__.copy()
@@ -54,26 +121,18 @@ class ObjectData:
 
 class ApiData(ObjectData):
 
-    @property
-    def allowed_parameters(self):
-        return 'id', 'name', 'upstream_url',\
-               'hosts', 'uris', 'methods', 'strip_uri',\
-               'preserve_host', 'retries', 'https_only',\
-               'http_if_terminated', 'upstream_connect_timeout',\
-               'upstream_send_timeout', 'upstream_read_timeout',\
-               'created_at'
-
-    def validate_obligatory_parameters(self, **kwargs):
-        if 'upstream_url' not in kwargs:
-            raise SchemaViolation('name and upstream_url must be provided to _perform_create')
-
-    def validate_semi_optional_parameters(self, **kwargs):
-        if not ('hosts' in kwargs
-                or 'uris' in kwargs
-                or 'methods' in kwargs):
-            raise SchemaViolation('uris, methods or hosts must be provided to _perform_create')
+    allowed_parameters = 'id', 'name', 'upstream_url',\
+                         'hosts', 'uris', 'methods', 'strip_uri',\
+                         'preserve_host', 'retries', 'https_only',\
+                         'http_if_terminated', 'upstream_connect_timeout',\
+                         'upstream_send_timeout', 'upstream_read_timeout',\
+                         'created_at'
 
-        return kwargs
+    obligatory_parameters = ('upstream_url',)
+    obligatory_message = 'name and upstream_url must be provided to _perform_create'
+
+    semi_optional_parameters = 'hosts', 'uris', 'methods'
+    semi_optional_message = 'uris, methods or hosts must be provided to _perform_create'
 
     def add_uri(self, uri):
         self.uris.append(self.__normalize_uri(uri))
@@ -81,6 +140,8 @@ class ApiData(ObjectData):
 
     @staticmethod
     def __normalize_uri(uri):
+        import re
+
         normalized = uri.strip()
         if re.match(pattern=r'([/]{1}[\w\d]+)+\/?',
                     string=uri) is None:
@@ -88,15 +149,30 @@ class ApiData(ObjectData):
         return normalized
 
 
-class ServiceData(ObjectData):
+@lru_cache(maxsize=1024)
+def split_service_url(url):
+    from urllib3.util import parse_url
 
-    def validate_semi_optional_parameters(self, **kwargs):
-        pass
+    url = parse_url(url)
+    return url.scheme, url.host, url.port or 80, url.path or '/'
 
-    def validate_obligatory_parameters(self, **kwargs):
-        pass
 
-    def validate_schema(self, **kwargs):
+@lru_cache(maxsize=1024)
+def build_service_url(protocol, host, port, path):
+    from urllib3.util import Url
+
+    return Url(scheme=protocol, host=host, port=port, path=path).url
+
+
+class ServiceData(ObjectData):
+
+    allowed_parameters = 'name', 'protocol', 'host', 'port', 'path',\
+                         'retries', 'connect_timeout', 'send_timeout',\
+                         'read_timeout', 'url', 'id', \
+                         'created_at', 'updated_at', 'write_timeout'
+
+    @classmethod
+    def normalize_parameters(cls, kwargs):
 
         if 'url' not in kwargs:
             required_fields = ['host', 'protocol']
@@ -115,131 +191,87 @@ class ServiceData(ObjectData):
                 if field in kwargs:
                     raise SchemaViolation('%s: got multiple values' % field)
 
-            url = parse_url(kwargs.pop('url'))
-            kwargs['protocol'] = url.scheme
-            kwargs['host'] = url.host
-            kwargs['port'] = url.port or 80
-            kwargs['path'] = url.path or '/'
+            kwargs['protocol'], kwargs['host'], kwargs['port'], kwargs['path'] = \
+                split_service_url(kwargs.pop('url'))
 
         return kwargs
 
-    @property
-    def allowed_parameters(self):
-        return 'name', 'protocol', 'host', 'port', 'path',\
-               'retries', 'connect_timeout', 'send_timeout',\
-               'read_timeout', 'url', 'id', \
-               'created_at', 'updated_at', 'write_timeout'
-
     @property
     def url(self):
-        return Url(scheme=self.protocol, host=self.host, port=self.port, path=self.path).url
+        return build_service_url(self.protocol, self.host, self.port, self.path)
 
 
 class PluginData(ObjectData):
-    def validate_semi_optional_parameters(self, **kwargs):
-        pass
 
-    def validate_obligatory_parameters(self, **kwargs):
-        if "name" not in kwargs:
-            raise SchemaViolation('name must be provided to _perform_create')
+    allowed_parameters = "id", "service_id", "consumer_id",\
+                         "name", "config", "enabled",\
+                         "created_at", "api_id", "route_id"
 
-    @property
-    def allowed_parameters(self):
-        return "id", "service_id", "consumer_id",\
-               "name", "config", "enabled",\
-               "created_at", "api_id", "route_id"
+    obligatory_parameters = ("name",)
 
 
 class ConsumerData(ObjectData):
-    def validate_obligatory_parameters(self, **kwargs):
-        pass
 
-    @property
-    def allowed_parameters(self):
-        return "id", "username", "custom_id", "created_at"
+    allowed_parameters = "id", "username", "custom_id", "created_at"
 
-    def validate_semi_optional_parameters(self, **kwargs):
-        if ("username" not in kwargs) and ("custom_id" not in kwargs):
-            raise SchemaViolation('at least one of username or '
-                                  'custom_id must be provided '
-                                  'to _perform_create')
+    semi_optional_parameters = "username", "custom_id"
+    semi_optional_message = 'at least one of username or custom_id ' \
+                            'must be provided to _perform_create'
 
 
 class RouteData(ObjectData):
 
-    def validate_semi_optional_parameters(self, **kwargs):
-        if not ('hosts' in kwargs
-                or 'paths' in kwargs
-                or 'methods' in kwargs):
-            raise SchemaViolation('uris, methods or hosts must be provided to _perform_create')
-
-    def validate_obligatory_parameters(self, **kwargs):
-        pass
+    allowed_parameters = "id", "created_at", "updated_at", \
+                         "protocols", "methods", "hosts", \
+                         "paths", "regex_priority", "strip_path", \
+                         "preserve_host", "service"
 
-    @property
-    def allowed_parameters(self):
-        return "id", "created_at", "updated_at", \
-               "protocols", "methods", "hosts", \
-               "paths", "regex_priority", "strip_path", \
-               "preserve_host", "service"
+    semi_optional_parameters = 'hosts', 'paths', 'methods'
+    semi_optional_message = 'uris, methods or hosts must be provided to _perform_create'
 
 
 class TargetData(ObjectData):
-    def validate_semi_optional_parameters(self, **kwargs):
-        pass
 
-    def validate_obligatory_parameters(self, **kwargs):
-        if "target" not in kwargs:
-            raise SchemaViolation("target must be provided to _perform_create")
+    allowed_parameters = "id", "target", "weight", \
+                         "upstream_id", "created_at"
 
-    @property
-    def allowed_parameters(self):
-        return "id", "target", "weight", \
-               "upstream_id", "created_at"
+    obligatory_parameters = ("target",)
 
 
 class UpstreamData(ObjectData):
+
+    _update_params = (
+        'name', 'slots', 'hash_on', 'hash_fallback', 'hash_on_header',
+        'hash_fallback_header', 'healthchecks.active.timeout',
+        'healthchecks.active.concurrency',
+        'healthchecks.active.http_path',
+        'healthchecks.active.healthy.interval',
+        'healthchecks.active.healthy.http_statuses',
+        'healthchecks.active.healthy.successes',
+        'healthchecks.active.unhealthy.interval',
+        'healthchecks.active.unhealthy.http_statuses',
+        'healthchecks.active.unhealthy.tcp_failures',
+        'healthchecks.active.unhealthy.timeouts',
+        'healthchecks.active.unhealthy.http_failures',
+        'healthchecks.passive.healthy.http_statuses',
+        'healthchecks.passive.healthy.successes',
+        'healthchecks.passive.unhealthy.http_statuses',
+        'healthchecks.passive.unhealthy.tcp_failures',
+        'healthchecks.passive.unhealthy.timeouts',
+        'healthchecks.passive.unhealthy.http_failures',
+    )
+
+    allowed_parameters = _update_params + ('id', 'created_at', 'healthchecks')
+
+    obligatory_parameters = ("name",)
+
+    conditional_parameters = (
+        ('hash_on', 'header', 'hash_on_header',
+         'hash_on_header required when hash_on is set to header'),
+        ('hash_fallback', 'header', 'hash_fallback_header',
+         'hash_fallback_header required when hash_fallback is set to header'),
+    )
+
     @staticmethod
     def allowed_update_params():
-        return [
-            'name', 'slots', 'hash_on', 'hash_fallback', 'hash_on_header',
-            'hash_fallback_header', 'healthchecks.active.timeout',
-            'healthchecks.active.concurrency',
-            'healthchecks.active.http_path',
-            'healthchecks.active.healthy.interval',
-            'healthchecks.active.healthy.http_statuses',
-            'healthchecks.active.healthy.successes',
-            'healthchecks.active.unhealthy.interval',
-            'healthchecks.active.unhealthy.http_statuses',
-            'healthchecks.active.unhealthy.tcp_failures',
-            'healthchecks.active.unhealthy.timeouts',
-            'healthchecks.active.unhealthy.http_failures',
-            'healthchecks.passive.healthy.http_statuses',
-            'healthchecks.passive.healthy.successes',
-            'healthchecks.passive.unhealthy.http_statuses',
-            'healthchecks.passive.unhealthy.tcp_failures',
-            'healthchecks.passive.unhealthy.timeouts',
-            'healthchecks.passive.unhealthy.http_failures',
-        ]
-
-    def validate_semi_optional_parameters(self, **kwargs):
-        if ("hash_on" in kwargs) \
-                and (kwargs['hash_on'].lower() == "header") \
-                and ("hash_on_header" not in kwargs):
-            raise SchemaViolation("hash_on_header required when "
-                                  "hash_on is set to header")
-
-        if("hash_fallback" in kwargs) \
-                and (kwargs['hash_fallback'].lower() == 'header') \
-                and ('hash_fallback_header' not in kwargs):
-            raise SchemaViolation("hash_fallback_header required "
-                                  "when hash_fallback is set to "
-                                  "header")
-
-    def validate_obligatory_parameters(self, **kwargs):
-        if "name" not in kwargs:
-            raise SchemaViolation("name must be provided to _perform_create")
-
-    @property
-    def allowed_parameters(self):
-        return self.allowed_update_params()
+        return list(UpstreamData._update_params)
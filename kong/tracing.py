@@ -0,0 +1,217 @@
+import json
+import random
+import threading
+import time
+from functools import wraps
+
+
+def _new_id():
+    return '%016x' % random.getrandbits(64)
+
+
+class Span:  # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, tracer, name, parent=None, attributes=None):
+        self._tracer = tracer
+        self.name = name
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else _new_id()
+        self.span_id = _new_id()
+        self.attributes = dict(attributes or {})
+        self.error = None
+        self.start = time.time()
+        self.end = None
+        self._clock = time.perf_counter()
+        self.duration = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        if self.end is not None:
+            return
+        self.duration = time.perf_counter() - self._clock
+        self.end = self.start + self.duration
+        if error is not None:
+            self.error = '%s: %s' % (error.__class__.__name__, error)
+        self._tracer.export(self)
+
+    def as_dict(self):
+        return {'name': self.name,
+                'trace_id': self.trace_id,
+                'span_id': self.span_id,
+                'parent_id': self.parent_id,
+                'start': self.start,
+                'end': self.end,
+                'duration': self.duration,
+                'attributes': self.attributes,
+                'error': self.error}
+
+    def __enter__(self):
+        self._tracer.push(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._tracer.pop(self)
+        self.finish(exc_val)
+        return False
+
+
+class InMemoryCollector:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = []
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def find(self, name):
+        return [span for span in self.spans if span.name == name]
+
+    def children_of(self, span):
+        return [child for child in self.spans if child.parent_id == span.span_id]
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+
+class FileExporter:
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, 'a')
+
+    def export(self, span):
+        line = json.dumps(span.as_dict(), default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Tracer:
+
+    enabled = True
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter if exporter is not None else InMemoryCollector()
+        self._local = threading.local()
+
+    @property
+    def _stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    @property
+    def current_span(self):
+        stack = self._stack
+        return stack[-1] if stack else None
+
+    def push(self, span):
+        self._stack.append(span)
+
+    def pop(self, span):
+        stack = self._stack
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def span(self, name, parent=None, **attributes):
+        """
+            Creates a span that becomes the current span while used as a
+            context manager.
+        """
+        return Span(self, name, parent or self.current_span, attributes)
+
+    def start_span(self, name, parent=None, **attributes):
+        """
+            Creates a span that is never made current; it must be closed
+            calling finish(). Meant for generators, whose lifetime does not
+            follow the call stack.
+        """
+        return Span(self, name, parent or self.current_span, attributes)
+
+    def activate(self, span):
+        return _Activation(self, span)
+
+    def export(self, span):
+        self.exporter.export(span)
+
+
+class _Activation:
+
+    def __init__(self, tracer, span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self):
+        self._tracer.push(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._tracer.pop(self._span)
+        return False
+
+
+class _NullSpan:
+
+    span_id = None
+    trace_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def finish(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class NullTracer:
+
+    enabled = False
+
+    current_span = None
+
+    _span = _NullSpan()
+
+    def span(self, name, parent=None, **attributes):  # pylint:disable=unused-argument
+        return self._span
+
+    def start_span(self, name, parent=None, **attributes):  # pylint:disable=unused-argument
+        return self._span
+
+    def activate(self, span):
+        return span
+
+
+NULL_TRACER = NullTracer()
+
+
+def traced(method):
+    """
+        Wraps a client method in a span named after the client class and
+        the method.
+    """
+    operation = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        tracer = self.tracer
+        if not tracer.enabled:
+            return method(self, *args, **kwargs)
+        with tracer.span('%s.%s' % (self.__class__.__name__, operation)):
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,178 @@
+from kong.exceptions import SchemaViolation
+from kong.structures import ApiData, ConsumerData, PluginData, RouteData, \
+    ServiceData, TargetData, UpstreamData, Violation, VALUE_TYPES, split_service_url
+
+ENTITY_CLASSES = {
+    'apis': ApiData,
+    'consumers': ConsumerData,
+    'plugins': PluginData,
+    'routes': RouteData,
+    'services': ServiceData,
+    'targets': TargetData,
+    'upstreams': UpstreamData,
+}
+
+# marks a cell whose row lacks the field, None being a valid value
+_ABSENT = object()
+
+
+def to_columns(records):
+    """
+        Turns a list of dicts into a dict of equally long columns, where
+        a private sentinel marks the rows missing the field.
+    """
+    records = list(records)
+    columns = {}
+    for row, record in enumerate(records):
+        for field, value in record.items():
+            column = columns.get(field)
+            if column is None:
+                column = columns[field] = [_ABSENT] * len(records)
+            column[row] = value
+    return columns, len(records)
+
+
+def validate_batch(object_data_class, batch):
+    """
+        Validates a batch of entities of one class, given either as a list
+        of dicts or as a dict of columns, and returns a Violation for each
+        problem found, ordered by row.
+
+        Every rule is checked column by column across the whole batch, so
+        no object is built. In a dict of columns a None cell marks a row
+        missing the field; in a list of dicts a field set to None is
+        present, as it is for the constructors.
+    """
+    if isinstance(batch, dict):
+        lengths = {len(column) for column in batch.values()}
+        if len(lengths) > 1:
+            raise ValueError('columns must have the same length')
+        length = lengths.pop() if lengths else 0
+        columns = {field: [_ABSENT if value is None else value for value in column]
+                   for field, column in batch.items()}
+    else:
+        columns, length = to_columns(batch)
+
+    violations = []
+    for check in _CHECKS + _CLASS_CHECKS.get(object_data_class, ()):
+        violations.extend(check(object_data_class, columns, length))
+
+    violations.sort(key=lambda violation: violation.row)
+    return violations
+
+
+def validate_state(state):
+    """
+        Validates a desired state mapping collection names (services,
+        routes, upstreams...) to batches. Returns the violations of every
+        collection having any.
+    """
+    report = {}
+    for collection, batch in state.items():
+        if collection not in ENTITY_CLASSES:
+            raise KeyError('invalid collection: %s' % collection)
+        violations = validate_batch(ENTITY_CLASSES[collection], batch)
+        if violations:
+            report[collection] = violations
+    return report
+
+
+def _missing(columns, field, length):
+    column = columns.get(field)
+    if column is None:
+        return range(length)
+    return [row for row, value in enumerate(column) if value is _ABSENT]
+
+
+def _check_parameters(object_data_class, columns, length):  # pylint:disable=unused-argument
+    allowed = frozenset(object_data_class.allowed_parameters)
+    for field, column in columns.items():
+        if field not in allowed:
+            error = SchemaViolation('invalid parameter: %s' % field)
+            for row, value in enumerate(column):
+                if value is not _ABSENT:
+                    yield Violation(row, error)
+            continue
+        error = ValueError('invalid value: %s value must be str, int, '
+                           'bool, _perform_list or dict' % field)
+        for row, value in enumerate(column):
+            if value is not _ABSENT and not isinstance(value, VALUE_TYPES):
+                yield Violation(row, error)
+
+
+def _check_obligatory(object_data_class, columns, length):
+    for field in object_data_class.obligatory_parameters:
+        error = SchemaViolation(object_data_class.obligatory_message % {'parameter': field})
+        for row in _missing(columns, field, length):
+            yield Violation(row, error)
+
+
+def _check_semi_optional(object_data_class, columns, length):
+    fields = object_data_class.semi_optional_parameters
+    if not fields:
+        return
+    error = SchemaViolation(object_data_class.semi_optional_message)
+    present = [columns[field] for field in fields if field in columns]
+    if not present:
+        for row in range(length):
+            yield Violation(row, error)
+        return
+    for row, values in enumerate(zip(*present)):
+        if all(value is _ABSENT for value in values):
+            yield Violation(row, error)
+
+
+def _check_conditional(object_data_class, columns, length):  # pylint:disable=unused-argument
+    for field, value, dependant, message in object_data_class.conditional_parameters:
+        column = columns.get(field)
+        if column is None:
+            continue
+        error = SchemaViolation(message)
+        dependants = columns.get(dependant) or [_ABSENT] * len(column)
+        for row, (cell, dependant_cell) in enumerate(zip(column, dependants)):
+            if cell is not _ABSENT and dependant_cell is _ABSENT and str(cell).lower() == value:
+                yield Violation(row, error)
+
+
+def _check_url_column(field, columns):
+    for row, url in enumerate(columns.get(field) or ()):
+        if url is _ABSENT or url is None:
+            continue
+        try:
+            scheme, host, _, _ = split_service_url(url)
+        except (ValueError, TypeError):
+            scheme = host = None
+        if not scheme or not host:
+            yield Violation(row, SchemaViolation('%s: invalid url %s' % (field, url)))
+
+
+def _check_service_urls(object_data_class, columns, length):  # pylint:disable=unused-argument
+    urls = columns.get('url') or [_ABSENT] * length
+    for field in ('host', 'protocol', 'port', 'path'):
+        column = columns.get(field)
+        if column is None:
+            continue
+        error = SchemaViolation('%s: got multiple values' % field)
+        for row, (url, value) in enumerate(zip(urls, column)):
+            if url is not _ABSENT and value is not _ABSENT:
+                yield Violation(row, error)
+
+    for field in ('host', 'protocol'):
+        error = SchemaViolation('%s: required field missing' % field)
+        for row in _missing(columns, field, length):
+            if urls[row] is _ABSENT:
+                yield Violation(row, error)
+
+    yield from _check_url_column('url', columns)
+
+
+def _check_api_urls(object_data_class, columns, length):  # pylint:disable=unused-argument
+    return _check_url_column('upstream_url', columns)
+
+
+_CHECKS = (_check_obligatory, _check_semi_optional, _check_conditional, _check_parameters)
+
+_CLASS_CHECKS = {
+    ServiceData: (_check_service_urls,),
+    ApiData: (_check_api_urls,),
+}
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import namedtuple
+
+from kong.fingerprints import fingerprint
+
+Event = namedtuple('Event', ['kind', 'entity_type', 'id', 'entity'])
+
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+ENTITY_TYPES = ('apis', 'consumers', 'plugins', 'services', 'routes', 'upstreams')
+
+
+class Watcher:  # pylint: disable=too-many-instance-attributes
+    """
+        Polls paged listings and yields an Event for every entity added,
+        changed or removed since the previous poll.
+
+        Only a 64 bit fingerprint is kept per entity. The interval halves
+        down to min_interval while changes keep coming and grows by half
+        up to max_interval while nothing changes.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, kong_admin_client, entity_types=ENTITY_TYPES, interval=60,
+                 min_interval=None, max_interval=None, page_size=1000,
+                 emit_initial=False, sleep=None):
+        for entity_type in entity_types:
+            if entity_type not in ENTITY_TYPES:
+                raise KeyError('invalid entity type: %s' % entity_type)
+
+        self._client = kong_admin_client
+        self.entity_types = tuple(entity_types)
+        self.interval = interval
+        self.min_interval = min_interval if min_interval is not None else interval / 4.
+        self.max_interval = max_interval if max_interval is not None else interval * 4.
+        self.page_size = page_size
+        self._emit_initial = emit_initial
+        self._stopped = threading.Event()
+        self._sleep = sleep or self._stopped.wait
+        self._fingerprints = {}
+
+    def poll(self):
+        events = []
+        for entity_type in self.entity_types:
+            events.extend(self._poll_type(entity_type))
+        return events
+
+    def _poll_type(self, entity_type):
+        client = getattr(self._client, entity_type)
+        previous = self._fingerprints.get(entity_type)
+        baseline = previous is None
+        if baseline:
+            previous = {}
+
+        current = {}
+        events = []
+        for entity in client._perform_list(self.page_size):  # pylint: disable=protected-access
+            entity_id = entity['id']
+            current[entity_id] = digest = fingerprint(entity)
+            known = previous.get(entity_id)
+            if known is None:
+                if not baseline or self._emit_initial:
+                    events.append(Event(ADDED, entity_type, entity_id, entity))
+            elif known != digest:
+                events.append(Event(CHANGED, entity_type, entity_id, entity))
+
+        for entity_id in previous.keys() - current.keys():
+            events.append(Event(REMOVED, entity_type, entity_id, None))
+
+        self._fingerprints[entity_type] = current
+        return events
+
+    def _adapt(self, changed):
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2.)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+
+    def stop(self):
+        self._stopped.set()
+
+    def __len__(self):
+        return sum(len(fingerprints) for fingerprints in self._fingerprints.values())
+
+    def __iter__(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            events = self.poll()
+            for event in events:
+                yield event
+            self._adapt(events)
+
+            if self._stopped.is_set():
+                break
+            self._sleep(max(0., self.interval - (time.monotonic() - started)))
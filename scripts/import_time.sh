@@ -0,0 +1,8 @@
+#!/usr/bin/env bash
+set -e
+DIR=$(dirname "$0")
+cd ${DIR}/..
+
+echo "Measuring import time of kong.kong_clients"
+python -X importtime -c "import kong.kong_clients" 2>&1 | sort -t'|' -k2 -n | tail -15
+echo "import time OK :)"
@@ -43,5 +43,8 @@ setup(
     ],
     keywords=[],
     install_requires=requirements,
-    extras_require={},
+    extras_require={
+        'fast-json': ['orjson'],
+        'simulation': ['numpy'],
+    },
 )
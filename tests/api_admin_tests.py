@@ -209,7 +209,7 @@ class ApiAdminClientTest(unittest.TestCase):
                          'id': self.api_kong_id,
                          'name': self.api_name,
                          'upstream_url': self.api_upstream_url}
-        self.session_mock.get.assert_called_once_with(self.apis_endpoint, data=expected_data)
+        self.session_mock.get.assert_called_once_with(self.apis_endpoint, params=expected_data)
 
     def test_api_admin_list_w_invalid_params(self):
         # Setup
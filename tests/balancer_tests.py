@@ -0,0 +1,90 @@
+import importlib.util
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+if HAS_NUMPY:
+    from kong.balancer import Ring, hash_keys, synthetic_keys
+
+
+@unittest.skipIf(not HAS_NUMPY, 'the simulation extra is not installed')
+class RingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = Ring([('10.0.0.1:80', 100), ('10.0.0.2:80', 100), ('10.0.0.3:80', 50)],
+                         slots=1000)
+        self.keys = synthetic_keys(200000)
+
+    def test_slots_follow_weights(self):
+        # Exercise
+        distribution = self.ring.distribution(self.keys)
+
+        # Verify
+        self.assertEqual(200000, sum(distribution.counts.values()))
+        self.assertAlmostEqual(0.2, distribution.shares['10.0.0.3:80'], places=2)
+        self.assertLess(distribution.max_skew, 1.05)
+
+    def test_adding_a_target_moves_only_its_share(self):
+        # Exercise
+        ring = self.ring.with_target('10.0.0.4:80', 250)
+        churn = self.ring.churn(ring, self.keys)
+
+        # Verify
+        self.assertAlmostEqual(0.5, churn.fraction, places=2)
+        moved = self.ring.map(self.keys) != ring.map(self.keys)
+        self.assertTrue((ring.map(self.keys)[moved] == ring.names.index('10.0.0.4:80')).all())
+        self.assertEqual(3, len(self.ring.targets))
+
+    def test_removing_a_target_moves_only_its_keys(self):
+        # Exercise
+        ring = self.ring.without_target('10.0.0.3:80')
+        churn = self.ring.churn(ring, self.keys)
+
+        # Verify
+        self.assertEqual(self.ring.distribution(self.keys).counts['10.0.0.3:80'], churn.moved)
+        self.assertNotIn('10.0.0.3:80', ring.distribution(self.keys).counts)
+        self.assertEqual(0, self.ring.churn(ring.with_target('10.0.0.3:80', 50), self.keys).moved)
+
+    def test_lookup_hashes_like_kong(self):
+        # Setup
+        hashes = hash_keys(['consumer-1', b'consumer-2', 3])
+
+        # Verify
+        self.assertEqual([self.ring.lookup(value) for value in ('consumer-1', 'consumer-2', 3)],
+                         [self.ring.names[index] for index in self.ring.map(hashes)])
+
+    def test_lookup_without_targets(self):
+        # Setup
+        ring = Ring([('10.0.0.1:80', 100)], slots=10)
+
+        # Exercise & Verify
+        self.assertEqual('10.0.0.1:80', ring.lookup('x'))
+        self.assertIsNone(ring.without_target('10.0.0.1:80').lookup('x'))
+
+    def test_negative_weight(self):
+        self.assertRaisesRegex(ValueError, 'must not be negative',
+                               lambda: self.ring.with_target('10.0.0.4:80', -1))
+
+    def test_from_kong_keeps_latest_target_entries(self):
+        # Setup
+        session = MagicMock()
+        upstream = MagicMock(status_code=200)
+        upstream.json.return_value = {'id': '1', 'name': 'billing-up', 'slots': 100}
+        targets = MagicMock(status_code=200)
+        targets.json.return_value = {'data': [
+            {'id': 'a', 'target': '10.0.0.1:80', 'weight': 100, 'created_at': 1},
+            {'id': 'b', 'target': '10.0.0.2:80', 'weight': 100, 'created_at': 2},
+            {'id': 'c', 'target': '10.0.0.1:80', 'weight': 0, 'created_at': 3},
+        ]}
+        session.get.side_effect = lambda url, **kwargs: \
+            targets if url.endswith('/targets/all/') else upstream
+
+        # Exercise
+        ring = Ring.from_kong(KongAdminClient('http://kong.url/', session), 'billing-up')
+
+        # Verify
+        self.assertEqual(100, ring.slots)
+        self.assertEqual({'10.0.0.2:80': 100}, ring.targets)
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.buffering import merge_update
+from kong.kong_clients import KongAdminClient
+
+
+class WriteBehindBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.patch.side_effect = self.patch
+        self.client = KongAdminClient('http://kong.url/', self.session)
+
+    @staticmethod
+    def patch(url, json=None, **kwargs):  # pylint:disable=unused-argument,redefined-outer-name
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = dict(json, name=url.rsplit('/', 1)[-1])
+        return response
+
+    def test_updates_to_one_key_are_merged(self):
+        # Setup
+        buffer = self.client.upstreams.write_behind(window=60)
+
+        # Exercise
+        first = buffer.update('billing-up', slots=100)
+        second = buffer.update('billing-up', slots=200, hash_on='ip')
+        other = buffer.update('search-up', slots=10)
+        buffer.flush()
+
+        # Verify
+        self.assertIs(first, second)
+        self.assertEqual(200, first.result(1).slots)
+        self.assertEqual(10, other.result(1).slots)
+        self.assertEqual(2, self.session.patch.call_count)
+        self.session.patch.assert_any_call('http://kong.url/upstreams/billing-up',
+                                           json={'slots': 200, 'hash_on': 'ip'})
+        self.assertEqual(1, buffer.merged)
+        buffer.close()
+
+    def test_window_expiry_sends_in_background(self):
+        # Setup
+        buffer = self.client.upstreams.write_behind(window=0.01)
+
+        # Exercise
+        future = buffer.update('billing-up', slots=100)
+
+        # Verify
+        self.assertEqual(100, future.result(5).slots)
+        self.assertEqual(0, len(buffer))
+        buffer.close()
+
+    def test_errors_are_set_on_the_future(self):
+        # Setup
+        with self.client.upstreams.write_behind(window=60) as buffer:
+
+            # Exercise
+            future = buffer.update('billing-up', invalid=1)
+
+        # Verify
+        self.assertRaisesRegex(KeyError, 'invalid', lambda: future.result(1))
+        self.session.patch.assert_not_called()
+
+    def test_closed_buffer_refuses_updates(self):
+        # Setup
+        buffer = self.client.upstreams.write_behind(window=60)
+        buffer.close()
+
+        # Verify
+        self.assertRaises(RuntimeError, lambda: buffer.update('billing-up', slots=1))
+
+    def test_merge_update_merges_dicts(self):
+        # Setup
+        kwargs = {'config': {'minute': 5, 'hour': 100}, 'name': 'rate-limiting'}
+
+        # Exercise
+        merge_update(kwargs, {'config': {'minute': 10}})
+
+        # Verify
+        self.assertEqual({'config': {'minute': 10, 'hour': 100}, 'name': 'rate-limiting'},
+                         kwargs)
@@ -0,0 +1,129 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from kong.cache import StateCache
+from kong.kong_clients import KongAdminClient
+from kong.structures import ConsumerData
+
+
+class StateCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'state.db')
+        self.consumers = [{'id': '1', 'username': 'alice'},
+                          {'id': '2', 'custom_id': 'c-2'},
+                          {'id': '3', 'username': 'carol'}]
+        self.session = MagicMock()
+        self.session.get.side_effect = self.get
+        self.client = KongAdminClient('http://kong.url/', self.session)
+        self.cache = StateCache(self.path, self.client)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def get(self, url, **kwargs):  # pylint:disable=unused-argument
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {'data': [dict(consumer) for consumer in self.consumers]}
+        return response
+
+    def test_populate_and_lookup(self):
+        # Exercise
+        self.cache.populate('consumers')
+
+        # Verify
+        self.assertEqual(3, self.cache.count('consumers'))
+        self.assertEqual('1', self.cache.get('consumers', 'alice')['id'])
+        self.assertEqual('2', self.cache.get('consumers', 'c-2')['id'])
+        self.assertEqual('carol', self.cache.get('consumers', '3')['username'])
+        self.assertIsNone(self.cache.get('consumers', 'dave'))
+        self.assertEqual(ConsumerData(id='1', username='alice'),
+                         self.cache.get_object('consumers', 'alice'))
+
+    def test_lookup_by_custom_id_and_username(self):
+        # Setup
+        self.consumers = [{'id': '1', 'username': 'alice', 'custom_id': 'cid-1'}]
+
+        # Exercise
+        self.cache.populate('consumers')
+
+        # Verify
+        self.assertEqual('1', self.cache.get('consumers', 'cid-1')['id'])
+        self.assertEqual('1', self.cache.get('consumers', 'alice')['id'])
+
+    def test_renamed_entities_lose_their_old_names(self):
+        # Setup
+        self.cache.populate('consumers')
+        self.consumers[0] = {'id': '1', 'username': 'alicia'}
+
+        # Exercise
+        self.cache.revalidate('consumers')
+
+        # Verify
+        self.assertIsNone(self.cache.get('consumers', 'alice'))
+        self.assertEqual('1', self.cache.get('consumers', 'alicia')['id'])
+
+    def test_files_of_older_versions_are_rebuilt(self):
+        # Setup
+        self.cache.close()
+        os.remove(self.path)
+        with sqlite3.connect(self.path) as connection:
+            connection.execute('CREATE TABLE entities (entity_type TEXT, id TEXT, name TEXT, '
+                               'fingerprint INTEGER, body TEXT)')
+        connection.close()
+
+        # Exercise
+        self.cache = StateCache(self.path, self.client)
+        self.cache.populate('consumers')
+
+        # Verify
+        self.assertEqual('2', self.cache.get('consumers', 'c-2')['id'])
+
+    def test_reload_without_listing(self):
+        # Setup
+        self.cache.populate('consumers')
+        self.cache.close()
+        self.session.get.reset_mock()
+
+        # Exercise
+        reopened = StateCache(self.path, self.client)
+        reopened.warm(['consumers'])
+
+        # Verify
+        self.assertEqual(3, len(list(reopened.load('consumers'))))
+        self.session.get.assert_not_called()
+        reopened.close()
+
+    def test_revalidate_writes_only_changes(self):
+        # Setup
+        self.cache.populate('consumers')
+        self.consumers = [{'id': '1', 'username': 'alice', 'custom_id': 'c-1'},
+                          {'id': '2', 'custom_id': 'c-2'},
+                          {'id': '4', 'username': 'dave'}]
+
+        # Exercise
+        added, changed, removed = self.cache.revalidate('consumers')
+
+        # Verify
+        self.assertEqual((['4'], ['1'], ['3']), (added, changed, removed))
+        self.assertEqual('c-1', self.cache.get('consumers', 'alice')['custom_id'])
+        self.assertEqual('alice', self.cache.get('consumers', 'c-1')['username'])
+        self.assertIsNone(self.cache.get('consumers', 'carol'))
+        self.assertEqual(3, self.cache.count('consumers'))
+
+    def test_warm_revalidates_stale_types(self):
+        # Setup
+        self.cache.warm(['consumers'])
+        self.consumers.append({'id': '4', 'username': 'dave'})
+
+        # Exercise
+        self.cache.warm(['consumers'], max_age=-1)
+
+        # Verify
+        self.assertEqual(4, self.cache.count('consumers'))
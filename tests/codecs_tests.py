@@ -0,0 +1,58 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from kong.codecs import FastJsonCodec, JsonCodec, fastest_codec
+from kong.kong_clients import KongAdminClient
+
+
+class FastJsonCodecTest(unittest.TestCase):
+
+    def setUp(self):
+        self.codec = FastJsonCodec(json.dumps, json.loads)
+        self.session = MagicMock()
+        self.kong_url = 'http://kong.url/'
+        self.client = KongAdminClient(self.kong_url, self.session, codec=self.codec)
+
+        self.consumer = {'id': 'foo-id', 'username': 'foo'}
+
+    def test_bodies_are_encoded_once_to_bytes(self):
+        # Setup
+        self.session.post.return_value.status_code = 201
+        self.session.post.return_value.content = json.dumps(self.consumer).encode()
+
+        # Exercise
+        created = self.client.consumers.create(username='foo')
+
+        # Verify
+        self.session.post.assert_called_once_with(self.kong_url + 'consumers/',
+                                                  data=b'{"username": "foo"}',
+                                                  headers={'Content-Type': 'application/json'})
+        self.assertEqual(self.consumer, created.as_dict())
+
+    def test_list_decodes_raw_content(self):
+        # Setup
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.content = json.dumps({'data': [self.consumer]}).encode()
+
+        # Exercise
+        consumers = list(self.client.consumers.list())
+
+        # Verify
+        self.assertEqual([self.consumer], [consumer.as_dict() for consumer in consumers])
+        self.session.get.return_value.json.assert_not_called()
+
+    def test_fastest_codec_round_trip(self):
+        # Setup
+        codec = fastest_codec()
+        response = MagicMock()
+
+        # Exercise
+        response.content = codec.encode(self.consumer)['data']
+
+        # Verify
+        self.assertEqual(self.consumer, codec.decode(response))
+
+    def test_default_codec_is_left_to_requests(self):
+        self.assertIsInstance(KongAdminClient(self.kong_url, self.session).services.codec,
+                              JsonCodec)
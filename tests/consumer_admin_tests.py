@@ -117,7 +117,7 @@ class ApiAdminClientTest(unittest.TestCase):
 
         # Verify
         expected_data = {'offset': None, 'size': 10}
-        self.session_mock.get.asser_called_once_with(self.consumer_endpoint, data=expected_data)
+        self.session_mock.get.asser_called_once_with(self.consumer_endpoint, params=expected_data)
 
     def test_list_consumers_w_params(self):
         # Setup
@@ -136,7 +136,7 @@ class ApiAdminClientTest(unittest.TestCase):
                          'id': self.consumer_id,
                          'username': self.consumer_username,
                          'custom_id': self.consumer_custom_id}
-        self.session_mock.get.asser_called_once_with(self.consumer_endpoint, data=expected_data)
+        self.session_mock.get.asser_called_once_with(self.consumer_endpoint, params=expected_data)
 
     def test_list_consumers_w_invalid_params(self):
         # Setup
@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import MagicMock
+
+import faker
+
+from kong.indexes import ConsumerIndex
+from kong.kong_clients import ConsumerAdminClient
+
+
+class ConsumerIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.faker = faker.Faker()
+
+        self.consumers = [{'id': self.faker.uuid4(),
+                           'username': self.faker.user_name() + str(i),
+                           'custom_id': self.faker.uuid4()} for i in range(3)]
+
+        self.session = MagicMock()
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.side_effect = [
+            {'data': self.consumers[:2], 'offset': 'next'},
+            {'data': self.consumers[2:]}
+        ]
+
+        self.kong_url = 'http://kong.url/'
+        self.client = ConsumerAdminClient(self.kong_url, _session=self.session)
+        self.index = ConsumerIndex(self.client, page_size=2)
+
+    def test_refresh_scans_every_page(self):
+        # Exercise
+        self.index.refresh()
+
+        # Verify
+        self.assertEqual(3, len(self.index))
+        self.assertEqual(2, self.session.get.call_count)
+
+    def test_lookup_by_every_key(self):
+        # Setup
+        self.index.refresh()
+        consumer = self.consumers[1]
+
+        # Exercise & Verify
+        self.assertEqual(consumer['id'], self.index.by_id(consumer['id']).id)
+        self.assertEqual(consumer['id'], self.index.by_username(consumer['username']).id)
+        self.assertEqual(consumer['id'], self.index.by_custom_id(consumer['custom_id']).id)
+        self.assertEqual(consumer['id'], self.index.get(consumer['username']).id)
+        self.assertIsNone(self.index.get('unknown'))
+
+    def test_refresh_one_updates_changed_username(self):
+        # Setup
+        self.index.refresh()
+        consumer = dict(self.consumers[0], username='renamed')
+        self.session.get.return_value.json.side_effect = None
+        self.session.get.return_value.json.return_value = consumer
+
+        # Exercise
+        self.index.refresh_one(consumer['id'])
+
+        # Verify
+        self.session.get.assert_called_with(self.kong_url + 'consumers/' + consumer['id'])
+        self.assertEqual(consumer['id'], self.index.by_username('renamed').id)
+        self.assertIsNone(self.index.by_username(self.consumers[0]['username']))
+        self.assertEqual(3, len(self.index))
+
+    def test_refresh_one_drops_deleted_consumer(self):
+        # Setup
+        self.index.refresh()
+        consumer = self.consumers[2]
+        self.session.get.return_value.status_code = 404
+        self.session.get.return_value.content = 'Not found'
+
+        # Exercise
+        self.index.refresh_one(consumer['username'])
+
+        # Verify
+        self.assertNotIn(consumer['id'], self.index)
+        self.assertNotIn(consumer['custom_id'], self.index)
+        self.assertEqual(2, len(self.index))
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+
+
+class FilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.kong_url = 'http://kong.url/'
+        self.session = MagicMock()
+        self.session.get.return_value.status_code = 200
+        self.client = KongAdminClient(self.kong_url, self.session)
+
+    def respond(self, *elements):
+        self.session.get.return_value.json.return_value = {'data': list(elements)}
+
+    def test_supported_predicates_are_sent_in_query_string(self):
+        # Setup
+        self.respond({'id': '1', 'username': 'alice'})
+
+        # Exercise
+        consumers = list(self.client.consumers.filter(username='alice'))
+
+        # Verify
+        self.assertEqual(['alice'], [consumer.username for consumer in consumers])
+        self.session.get.assert_called_once_with(self.kong_url + 'consumers/',
+                                                 params={'offset': None, 'size': 10,
+                                                         'username': 'alice'})
+
+    def test_other_predicates_are_applied_locally(self):
+        # Setup
+        self.respond({'id': '1', 'name': 'a', 'host': 'a.com', 'protocol': 'http', 'port': 80,
+                      'path': '/', 'retries': 5},
+                     {'id': '2', 'name': 'b', 'host': 'b.com', 'protocol': 'https', 'port': 443,
+                      'path': '/', 'retries': 1})
+
+        # Exercise
+        services = list(self.client.services.filter(protocol='https',
+                                                    retries=lambda retries: retries < 3))
+
+        # Verify
+        self.assertEqual(['b'], [service.name for service in services])
+        self.session.get.assert_called_once_with(self.kong_url + 'services/',
+                                                 params={'offset': None, 'size': 10})
+
+    def test_callable_predicate_on_query_param_is_applied_locally(self):
+        # Setup
+        self.respond({'id': '1', 'username': 'alice'}, {'id': '2', 'username': 'bob'})
+
+        # Exercise
+        consumers = list(self.client.consumers.filter(username=lambda name: name.startswith('b')))
+
+        # Verify
+        self.assertEqual(['bob'], [consumer.username for consumer in consumers])
+        self.session.get.assert_called_once_with(self.kong_url + 'consumers/',
+                                                 params={'offset': None, 'size': 10})
+
+    def test_target_filter_uses_upstream_endpoint(self):
+        # Setup
+        self.respond({'id': '1', 'target': '10.0.0.1:80', 'weight': 100})
+
+        # Exercise
+        targets = list(self.client.targets.filter('upstream', target='10.0.0.1:80'))
+
+        # Verify
+        self.assertEqual(1, len(targets))
+        self.session.get.assert_called_once_with(self.kong_url + 'upstreams/upstream/targets/',
+                                                 params={'offset': None, 'size': 10,
+                                                         'target': '10.0.0.1:80'})
+
+    def test_invalid_filter(self):
+        # Verify
+        self.assertRaisesRegex(KeyError, 'invalid filter: foo',
+                               lambda: self.client.consumers.filter(foo='bar'))
+        self.session.get.assert_not_called()
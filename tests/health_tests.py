@@ -0,0 +1,87 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from kong.health import HealthMonitor, UpstreamHealth
+from kong.kong_clients import KongAdminClient
+
+
+def target(address, health):
+    return {'target': address, 'weight': 100, 'health': health}
+
+
+class HealthSweepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.kong_url = 'http://kong.url/'
+        self.upstreams = [{'id': '1', 'name': 'billing-up', 'slots': 100, 'created_at': 1,
+                           'healthchecks': {'active': {'timeout': 1}}},
+                          {'id': '2', 'name': 'search-up', 'slots': 100}]
+        self.health = {
+            'billing-up': [target('10.0.0.1:80', 'HEALTHY'), target('10.0.0.2:80', 'UNHEALTHY')],
+            'search-up': [target('10.0.1.1:80', 'HEALTHCHECKS_OFF')],
+        }
+        self.threads = set()
+        self.session = MagicMock()
+        self.session.get.side_effect = self.get
+        self.client = KongAdminClient(self.kong_url, self.session)
+
+    def get(self, url, **kwargs):  # pylint:disable=unused-argument
+        response = MagicMock()
+        response.status_code = 200
+        if url.endswith('/health/'):
+            self.threads.add(threading.current_thread().name)
+            name = url[len(self.kong_url + 'upstreams/'):-len('/health/')]
+            if name not in self.health:
+                response.status_code = 404
+                response.content = 'Not found'
+            response.json.return_value = {'data': self.health.get(name, [])}
+        else:
+            response.json.return_value = {'data': list(self.upstreams)}
+        return response
+
+    def test_sweep_summarizes_every_upstream(self):
+        # Exercise
+        summary = self.client.upstreams.health_sweep(max_workers=4)
+
+        # Verify
+        self.assertEqual({'billing-up': UpstreamHealth(1, 1, 0, None),
+                          'search-up': UpstreamHealth(0, 0, 1, None)}, summary)
+        self.assertNotIn(threading.current_thread().name, self.threads)
+
+    def test_failures_are_reported(self):
+        # Exercise
+        summary = self.client.upstreams.health_sweep(names=['gone-up'])
+
+        # Verify
+        self.assertEqual('NameError: Not found', summary['gone-up'].error)
+
+    def test_monitor_reports_changes_only(self):
+        # Setup
+        reports = []
+
+        def sleep(seconds):  # pylint:disable=unused-argument
+            if len(reports) == 1:
+                self.health['billing-up'][1]['health'] = 'HEALTHY'
+                del self.upstreams[1]
+            else:
+                monitor.stop()
+
+        monitor = HealthMonitor(self.client.upstreams, interval=10, sleep=sleep)
+
+        # Exercise
+        for changes in monitor:
+            reports.append(changes)
+
+        # Verify
+        self.assertEqual(2, len(reports))
+        self.assertEqual({'billing-up', 'search-up'}, set(reports[0]))
+        self.assertEqual({'billing-up': UpstreamHealth(2, 0, 0, None), 'search-up': None},
+                         reports[1])
+
+    def test_upstream_listing_builds_upstream_data(self):
+        # Exercise
+        upstreams = list(self.client.upstreams.list())
+
+        # Verify
+        self.assertEqual({'billing-up', 'search-up'}, {upstream.name for upstream in upstreams})
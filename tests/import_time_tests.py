@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECK = """
+import sys
+def loaded():
+    print(' '.join(module for module in ('requests', 'urllib3') if module in sys.modules))
+import kong.kong_clients
+loaded()
+client = kong.kong_clients.KongAdminClient('http://kong.url/')
+loaded()
+client.services.session
+loaded()
+"""
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def test_heavy_modules_are_imported_on_first_use(self):
+        # Exercise
+        output = subprocess.check_output([sys.executable, '-c', CHECK], cwd=ROOT,
+                                         universal_newlines=True)
+
+        # Verify
+        self.assertEqual(['', 'urllib3', 'requests urllib3'], output.split('\n')[:3])
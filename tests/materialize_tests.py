@@ -0,0 +1,88 @@
+import io
+import json
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.materialize import envelope_offset
+from kong.structures import ConsumerData, TargetData
+
+
+def consumers(start, count):
+    return [{'id': 'id-%d' % number, 'username': 'user-%d' % number, 'created_at': number}
+            for number in range(start, start + count)]
+
+
+class MaterializeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pages = {None: (consumers(0, 3), 'page-2'),
+                      'page-2': (consumers(3, 3), 'page-3'),
+                      'page-3': (consumers(6, 1), None)}
+        self.session = MagicMock()
+        self.session.get.side_effect = self.get
+        self.client = KongAdminClient('http://kong.url/', self.session)
+
+    def get(self, url, params=None, **kwargs):  # pylint:disable=unused-argument
+        data, offset = self.pages[params['offset']]
+        body = {'data': data, 'next': None if offset is None else url + '?offset=' + offset}
+        if offset is not None:
+            body['offset'] = offset
+        response = MagicMock()
+        response.status_code = 200
+        response.content = json.dumps(body).encode('utf-8')
+        return response
+
+    def test_envelope_offset(self):
+        self.assertEqual('abc', envelope_offset(b'{"data": [{"offset": 1}], "offset": "abc"}'))
+        self.assertEqual('abc', envelope_offset(b'{"offset":"abc","data":[{"offset":1}]}'))
+        self.assertIsNone(envelope_offset(b'{"data": [{"config": {"offset": 1}}]}'))
+        self.assertIsNone(envelope_offset(b'{"data": [], "next": null}'))
+
+    def test_parallel_list(self):
+        # Exercise
+        with ThreadPoolExecutor(2) as executor:
+            consumer_list = list(self.client.consumers.parallel_list(3, executor=executor,
+                                                                     max_pending=1))
+
+        # Verify
+        self.assertEqual([ConsumerData(**consumer) for consumer in consumers(0, 7)],
+                         consumer_list)
+        self.assertEqual(3, self.session.get.call_count)
+
+    def test_export_in_processes(self):
+        # Setup
+        file = io.BytesIO()
+
+        # Exercise
+        with ProcessPoolExecutor(2) as executor:
+            count = self.client.consumers.export(file, 3, executor=executor)
+
+        # Verify
+        self.assertEqual(7, count)
+        self.assertEqual(consumers(0, 7),
+                         [json.loads(line) for line in file.getvalue().splitlines()])
+
+    def test_invalid_records_raise(self):
+        # Setup
+        self.pages['page-3'] = ([{'id': 'x', 'username': 'x', 'unknown': 1}], None)
+
+        # Verify
+        with ThreadPoolExecutor(1) as executor:
+            self.assertRaisesRegex(Exception, 'invalid parameter: unknown',
+                                   lambda: list(self.client.consumers.parallel_list(
+                                       3, executor=executor)))
+
+    def test_targets(self):
+        # Setup
+        self.pages = {None: ([{'id': '1', 'target': '10.0.0.1:80', 'weight': 100}], None)}
+
+        # Exercise
+        with ThreadPoolExecutor(1) as executor:
+            targets = list(self.client.targets.parallel_list('billing-up', executor=executor))
+
+        # Verify
+        self.assertEqual([TargetData(id='1', target='10.0.0.1:80', weight=100)], targets)
+        self.assertEqual('http://kong.url/upstreams/billing-up/targets/',
+                         self.session.get.call_args[0][0])
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.merkle import MerkleTree
+
+
+def services(count, region='a'):
+    return [{'id': '%s-%d' % (region, number), 'name': 'service-%d' % number,
+             'host': 'host-%d' % number, 'protocol': 'http', 'port': 80, 'path': '/',
+             'created_at': number} for number in range(count)]
+
+
+class MerkleTreeTest(unittest.TestCase):
+
+    def test_same_entities_same_root(self):
+        # Setup
+        entities = services(500)
+
+        # Exercise
+        tree = MerkleTree(entities)
+        reversed_tree = MerkleTree(reversed(entities))
+
+        # Verify
+        self.assertEqual(tree.root, reversed_tree.root)
+        self.assertEqual([], tree.differing_buckets(reversed_tree))
+        self.assertEqual(500, len(tree))
+
+    def test_empty_trees_match(self):
+        self.assertEqual(MerkleTree().root, MerkleTree(buckets=256).root)
+
+    def test_diff_by_natural_key(self):
+        # Setup
+        mine = MerkleTree(services(500, 'a'), key='name',
+                          exclude=('id', 'created_at', 'updated_at'))
+        changed = services(501, 'b')
+        changed[7]['port'] = 8080
+        del changed[42]
+        theirs = MerkleTree(changed, key='name', exclude=('id', 'created_at', 'updated_at'))
+
+        # Exercise
+        added, modified, removed = mine.diff(theirs)
+
+        # Verify
+        self.assertEqual(['service-500'], added)
+        self.assertEqual(['service-7'], modified)
+        self.assertEqual(['service-42'], removed)
+        self.assertLessEqual(len(mine.differing_buckets(theirs)), 3)
+
+    def test_incremental_updates(self):
+        # Setup
+        entities = services(100)
+        tree = MerkleTree(entities[:99])
+        root = tree.root
+
+        # Exercise
+        tree.add(entities[99])
+        grown = tree.root
+        tree.remove(entities[99]['id'])
+
+        # Verify
+        self.assertNotEqual(root, grown)
+        self.assertEqual(root, tree.root)
+        self.assertEqual(MerkleTree(entities).root, grown)
+
+    def test_buckets_must_be_power_of_two(self):
+        # Verify
+        self.assertRaisesRegex(ValueError, 'power of two', lambda: MerkleTree(buckets=100))
+
+
+class ClientMerkleTreeTest(unittest.TestCase):
+
+    def test_merkle_tree_over_listing(self):
+        # Setup
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {'data': services(10)}
+        client = KongAdminClient('http://kong.url/', session)
+
+        # Exercise
+        tree = client.services.merkle_tree()
+
+        # Verify
+        self.assertEqual(MerkleTree(services(10)).root, tree.root)
+        session.get.assert_called_once_with('http://kong.url/services/',
+                                            params={'offset': None, 'size': 1000})
@@ -0,0 +1,56 @@
+import unittest
+
+from kong.exceptions import SchemaViolation
+from kong.structures import ServiceData, UpstreamData, ConsumerData
+
+
+class ValidateManyTest(unittest.TestCase):
+
+    def test_reports_every_violation_w_its_row(self):
+        # Setup
+        upstreams = [{'name': 'ok'},
+                     {'slots': 10},
+                     {'name': 'header', 'hash_on': 'header', 'foo': 'bar'},
+                     {'name': 'value', 'slots': object()}]
+
+        # Exercise
+        violations = UpstreamData.validate_many(upstreams)
+
+        # Verify
+        self.assertEqual([1, 2, 2, 3], [violation.row for violation in violations])
+        self.assertEqual([SchemaViolation, SchemaViolation, SchemaViolation, ValueError],
+                         [violation.error.__class__ for violation in violations])
+        self.assertRegex(str(violations[1].error), 'hash_on_header')
+        self.assertRegex(str(violations[2].error), 'foo')
+
+    def test_normalization_errors_are_reported(self):
+        # Setup
+        services = [{'url': 'http://example.org/path'},
+                    {'url': 'http://example.org/', 'host': 'example.org'},
+                    {'protocol': 'http'}]
+
+        # Exercise
+        violations = ServiceData.validate_many(services)
+
+        # Verify
+        self.assertEqual([(1, 'host: got multiple values'),
+                          (2, 'host: required field missing')],
+                         [(violation.row, str(violation.error)) for violation in violations])
+
+    def test_validated_dicts_are_not_modified(self):
+        # Setup
+        service = {'url': 'http://example.org/path'}
+
+        # Exercise
+        ServiceData.validate_many([service])
+
+        # Verify
+        self.assertEqual({'url': 'http://example.org/path'}, service)
+
+    def test_valid_rows(self):
+        self.assertEqual([], ConsumerData.validate_many([{'username': 'foo'},
+                                                         {'custom_id': 'bar'}]))
+
+    def test_constructor_raises_first_violation(self):
+        self.assertRaisesRegex(SchemaViolation, 'at least one of username',
+                               lambda: ConsumerData(foo='bar'))
@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.planning import LatencyStats, Plan, PlannedOperation, endpoint_key
+from kong.tracing import InMemoryCollector, Tracer
+
+
+class PlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.plan = Plan()
+
+    def test_patches_to_one_url_are_merged(self):
+        # Exercise
+        first = self.plan.record('patch', 'http://kong/services/a', {'retries': 1})
+        second = self.plan.record('patch', 'http://kong/services/a', {'read_timeout': 10})
+        self.plan.record('patch', 'http://kong/services/b', {'retries': 2})
+
+        # Verify
+        self.assertIs(first, second)
+        self.assertEqual({'retries': 1, 'read_timeout': 10}, first.payload)
+        self.assertEqual(2, len(self.plan))
+        self.assertEqual(1, self.plan.coalesced)
+
+    def test_delete_drops_pending_patches(self):
+        # Exercise
+        self.plan.record('patch', 'http://kong/services/a', {'retries': 1})
+        self.plan.record('delete', 'http://kong/services/a')
+        self.plan.record('delete', 'http://kong/services/a')
+
+        # Verify
+        self.assertEqual(['delete'], [operation.method for operation in self.plan])
+        self.assertEqual(2, self.plan.coalesced)
+
+    def test_identical_creates_are_recorded_once(self):
+        # Exercise
+        self.plan.record('post', 'http://kong/consumers/', {'username': 'alice'})
+        self.plan.record('post', 'http://kong/consumers/', {'username': 'alice'})
+        self.plan.record('post', 'http://kong/consumers/', {'username': 'bob'})
+
+        # Verify
+        self.assertEqual(2, len(self.plan))
+
+    def test_estimate_uses_recorded_latencies(self):
+        # Setup
+        stats = LatencyStats()
+        stats.add('patch', 'http://kong/services/x', 0.2)
+        stats.add('patch', 'http://kong/services/y', 0.4)
+        self.plan.record('patch', 'http://kong/services/a', {'retries': 1})
+        self.plan.record('delete', 'http://kong/routes/b')
+
+        # Exercise
+        total = self.plan.estimate(stats, default=0.1)
+
+        # Verify
+        self.assertAlmostEqual(0.4, total)
+        self.assertAlmostEqual(0.3, self.plan.operations[0].estimate)
+        self.assertEqual(0.1, self.plan.operations[1].estimate)
+
+    def test_endpoint_key(self):
+        self.assertEqual(('POST', 'upstreams/targets'),
+                         endpoint_key('post', 'http://kong:8001/upstreams/up/targets/'))
+
+
+class DryRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.return_value = {'version': '0.13.1'}
+        self.collector = InMemoryCollector()
+        self.client = KongAdminClient('http://kong.url/', self.session,
+                                      tracer=Tracer(self.collector))
+
+    def test_writes_are_planned_not_sent(self):
+        # Setup
+        dry_run = self.client.dry_run()
+
+        # Exercise
+        created = dry_run.services.create(name='billing', url='http://billing/')
+        dry_run.services.update('billing', retries=3)
+        dry_run.services.update('billing', read_timeout=1000)
+        dry_run.routes.delete('route-id')
+        dry_run.targets.set_healthy('billing-up', '10.0.0.1:80', False)
+        dry_run.node_information()
+
+        # Verify
+        self.assertIsInstance(created, PlannedOperation)
+        self.assertEqual([('post', 'http://kong.url/services/'),
+                          ('patch', 'http://kong.url/services/billing'),
+                          ('delete', 'http://kong.url/routes/route-id'),
+                          ('post', 'http://kong.url/upstreams/billing-up/targets/'
+                                   '10.0.0.1:80/unhealthy/')],
+                         [(operation.method, operation.url) for operation in dry_run.plan])
+        self.assertEqual({'retries': 3, 'read_timeout': 1000}, dry_run.plan.operations[1].payload)
+        self.session.post.assert_not_called()
+        self.session.patch.assert_not_called()
+        self.session.delete.assert_not_called()
+        self.session.get.assert_called_once()
+        self.assertIsNone(self.client.plan)
+
+    def test_latencies_from_spans(self):
+        # Setup
+        self.session.patch.return_value.status_code = 200
+        self.session.patch.return_value.json.return_value = {'id': '1', 'name': 'billing',
+                                                             'host': 'billing',
+                                                             'protocol': 'http'}
+        self.client.services.update('billing', retries=3)
+
+        # Exercise
+        stats = LatencyStats.from_spans(self.collector.spans)
+
+        # Verify
+        self.assertEqual(1, stats.count('patch', 'http://kong.url/services/other'))
+        self.assertIsNotNone(stats.mean('patch', 'http://kong.url/services/other'))
@@ -105,8 +105,8 @@ class PluginAdminTest(unittest.TestCase):
         # Verify
         self.assertEqual(plugin_data.as_dict(), self.plugin_json)
         self.session_mock.get.assert_called_once_with(self.plugins_endpoint,
-                                                      data={'size': 10,
-                                                            'offset': None})
+                                                      params={'size': 10,
+                                                              'offset': None})
 
     def test_list_plugins_w_parameters(self):
         # Setup
@@ -123,12 +123,12 @@ class PluginAdminTest(unittest.TestCase):
         # Verify
         self.assertEqual(plugin_data.as_dict(), self.plugin_json)
         self.session_mock.get.assert_called_once_with(self.plugins_endpoint,
-                                                      data={'size': 10,
-                                                            'offset': None,
-                                                            'id': self.plugin_id,
-                                                            'name': self.plugin_name,
-                                                            'api_id': self.api_name_or_id,
-                                                            'consumer_id': self.consumer_id})
+                                                      params={'size': 10,
+                                                              'offset': None,
+                                                              'id': self.plugin_id,
+                                                              'name': self.plugin_name,
+                                                              'api_id': self.api_name_or_id,
+                                                              'consumer_id': self.consumer_id})
 
     def test_list_plugins_w_invalid_parameters(self):
         # Verify
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import MagicMock
+
+import faker
+
+from kong.indexes import PluginIndex
+from kong.kong_clients import PluginAdminClient
+
+
+class PluginIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.faker = faker.Faker()
+
+        self.route_id = self.faker.uuid4()
+        self.service_id = self.faker.uuid4()
+        self.consumer_id = self.faker.uuid4()
+
+        self.global_rate_limit = self.plugin('rate-limiting')
+        self.service_rate_limit = self.plugin('rate-limiting', service_id=self.service_id)
+        self.consumer_rate_limit = self.plugin('rate-limiting', consumer_id=self.consumer_id,
+                                               route_id=self.route_id)
+        self.route_cors = self.plugin('cors', route_id=self.route_id)
+        self.other_route_cors = self.plugin('cors', route_id=self.faker.uuid4())
+        self.disabled_log = self.plugin('http-log', service_id=self.service_id, enabled=False)
+
+        plugins = [self.global_rate_limit, self.service_rate_limit, self.consumer_rate_limit,
+                   self.route_cors, self.other_route_cors, self.disabled_log]
+
+        self.session = MagicMock()
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.side_effect = [{'data': plugins[:3], 'offset': 'x'},
+                                                          {'data': plugins[3:]}]
+        self.client = PluginAdminClient('http://kong.url/', _session=self.session)
+
+        self.index = PluginIndex(self.client)
+        self.index.refresh()
+
+    def plugin(self, name, **scope):
+        return dict(id=self.faker.uuid4(), name=name, enabled=scope.pop('enabled', True),
+                    config={}, **scope)
+
+    def test_lookup_by_scope_and_name(self):
+        self.assertEqual(6, len(self.index))
+        self.assertEqual(3, len(self.index.by_name('rate-limiting')))
+        self.assertEqual(2, len(self.index.lookup('service_id', self.service_id)))
+        self.assertEqual([self.global_rate_limit['id']],
+                         [plugin.id for plugin in self.index.global_plugins()])
+
+    def test_effective_plugins_follow_precedence(self):
+        # Exercise
+        anonymous = self.index.effective(route_id=self.route_id, service_id=self.service_id)
+        authenticated = self.index.effective(route_id=self.route_id, service_id=self.service_id,
+                                             consumer_id=self.consumer_id)
+
+        # Verify
+        self.assertEqual({'rate-limiting': self.service_rate_limit['id'],
+                          'cors': self.route_cors['id']},
+                         {name: plugin.id for name, plugin in anonymous.items()})
+        self.assertEqual(self.consumer_rate_limit['id'], authenticated['rate-limiting'].id)
+
+    def test_incremental_updates(self):
+        # Setup
+        self.session.get.return_value.json.side_effect = None
+        self.session.get.return_value.json.return_value = dict(self.disabled_log, enabled=True)
+
+        # Exercise
+        self.index.refresh_one(self.disabled_log['id'])
+        self.index.remove(self.service_rate_limit['id'])
+
+        # Verify
+        effective = self.index.effective(service_id=self.service_id)
+        self.assertEqual(self.disabled_log['id'], effective['http-log'].id)
+        self.assertEqual(self.global_rate_limit['id'], effective['rate-limiting'].id)
+        self.assertEqual(1, len(self.index.lookup('service_id', self.service_id)))
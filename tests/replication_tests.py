@@ -0,0 +1,129 @@
+import itertools
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.replication import Replicator
+
+SOURCE_URL = 'http://source.url/'
+
+
+class FakeKong:
+    """
+        Stands in for a target session: assigns new ids on creation and
+        answers 409 for names already taken.
+    """
+
+    def __init__(self, prefix):
+        self.ids = ('%s-%d' % (prefix, number) for number in itertools.count())
+        self.created = []
+        self.names = {}
+        self.session = MagicMock()
+        self.session.post.side_effect = self.post
+        self.session.get.side_effect = self.get
+        self.session.patch.side_effect = self.patch
+
+    @staticmethod
+    def response(status_code, body=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.json.return_value = body
+        response.content = json.dumps(body)
+        return response
+
+    # pylint:disable=unused-argument,redefined-outer-name
+    def post(self, url, json=None, **kwargs):
+        if json.get('name') in self.names and not url.endswith('plugins/'):
+            return self.response(409, {'name': 'already exists'})
+        entity = dict(json, id=next(self.ids))
+        self.created.append((url, entity))
+        return self.response(201, entity)
+
+    def get(self, url, **kwargs):  # pylint:disable=unused-argument
+        name = url.rsplit('/', 1)[-1]
+        return self.response(200, {'id': self.names[name], 'name': name})
+
+    # pylint:disable=unused-argument,redefined-outer-name
+    def patch(self, url, json=None, **kwargs):
+        return self.response(200, dict(json, id=url.rsplit('/', 1)[-1]))
+
+
+class ReplicatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.source_data = {
+            'services/': [{'id': 's1', 'name': 'billing', 'host': 'billing', 'protocol': 'http',
+                           'port': 80, 'path': '/', 'created_at': 1}],
+            'routes/': [{'id': 'r1', 'paths': ['/billing'], 'service': {'id': 's1'},
+                         'created_at': 1}],
+            'upstreams/': [{'id': 'u1', 'name': 'billing-up', 'slots': 100}],
+            'upstreams/u1/targets/': [{'id': 't1', 'target': '10.0.0.1:80', 'weight': 100,
+                                       'upstream_id': 'u1'}],
+            'plugins/': [{'id': 'p1', 'name': 'rate-limiting', 'service_id': 's1',
+                          'config': {'minute': 5}}],
+        }
+        source_session = MagicMock()
+        source_session.get.side_effect = self.source_get
+        self.source = KongAdminClient(SOURCE_URL, source_session)
+
+    def source_get(self, url, **kwargs):  # pylint:disable=unused-argument
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {'data': list(self.source_data.get(url[len(SOURCE_URL):],
+                                                                        []))}
+        return response
+
+    def test_replicates_to_every_target_mapping_ids(self):
+        # Setup
+        fakes = [FakeKong('eu'), FakeKong('us')]
+        targets = [KongAdminClient('http://%d.url/' % number, fake.session)
+                   for number, fake in enumerate(fakes)]
+
+        # Exercise
+        reports = self.source.replicate_to(targets, queue_size=2)
+
+        # Verify
+        for number, (fake, report) in enumerate(zip(fakes, reports)):
+            url = 'http://%d.url/' % number
+            prefix = fake.created[0][1]['id'].split('-')[0]
+            self.assertEqual((5, 0, []), (report.created, report.updated, report.failed))
+            self.assertEqual([url + 'services/', url + 'routes/', url + 'upstreams/',
+                              url + 'upstreams/%s-2/targets/' % prefix, url + 'plugins/'],
+                             [created_url for created_url, _ in fake.created])
+            route = fake.created[1][1]
+            plugin = fake.created[4][1]
+            self.assertEqual({'id': prefix + '-0'}, route['service'])
+            self.assertEqual(prefix + '-0', plugin['service_id'])
+            self.assertNotIn('created_at', route)
+
+    def test_existing_entities_are_updated(self):
+        # Setup
+        fake = FakeKong('eu')
+        fake.names['billing'] = 'existing'
+        target = KongAdminClient('http://eu.url/', fake.session)
+
+        # Exercise
+        report, = Replicator(self.source, [target], entity_types=['services', 'routes']).run()
+
+        # Verify
+        self.assertEqual((1, 1), (report.created, report.updated))
+        fake.session.patch.assert_called_once()
+        self.assertEqual({'id': 'existing'}, fake.created[0][1]['service'])
+
+    def test_unreplicated_references_are_reported(self):
+        # Setup
+        fake = FakeKong('eu')
+        target = KongAdminClient('http://eu.url/', fake.session)
+
+        # Exercise
+        report, = Replicator(self.source, [target], entity_types=['routes']).run()
+
+        # Verify
+        self.assertEqual(0, report.created)
+        self.assertEqual([('routes', 'r1')], [failure[:2] for failure in report.failed])
+
+    def test_targets_require_upstreams(self):
+        # Verify
+        self.assertRaises(ValueError, lambda: Replicator(self.source, [],
+                                                         entity_types=['targets']))
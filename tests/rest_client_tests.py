@@ -44,3 +44,16 @@ class RestClientTest(unittest.TestCase):
 
         # Validate
         self.assertEqual('http://foo.bar/', normalized_url)
+
+    def test_normalize_url_is_memoized(self):
+        # Setup
+        url = 'http://memoized.foo.bar'
+        RestClient._normalize_url(url)
+        hits = RestClient._normalize_url.cache_info().hits
+
+        # Exercise
+        normalized_url = RestClient._normalize_url(url)
+
+        # Verify
+        self.assertEqual('http://memoized.foo.bar/', normalized_url)
+        self.assertEqual(hits + 1, RestClient._normalize_url.cache_info().hits)
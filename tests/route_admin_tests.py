@@ -84,7 +84,7 @@ class RouteAdminMockedTests(RouteAdminAbstractTests, unittest.TestCase):
         # Verify
         self.session.get\
             .assert_called_once_with('%sservices/%s/routes/' % (self.kong_url, self.service.id),
-                                     data={'offset': None, 'size': 10})
+                                     params={'offset': None, 'size': 10})
 
 
 @pytest.mark.slow
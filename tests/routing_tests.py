@@ -0,0 +1,182 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.routing import Router, PrefixTrie, ConflictAnalyzer, is_bounded, literal_prefix
+from kong.structures import ApiData, RouteData
+
+
+class PrefixTrieTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = PrefixTrie()
+        for key in ['/', '/foo', '/foo/bar', '/baz']:
+            self.trie.insert(key, key)
+
+    def test_prefixes_of(self):
+        # Exercise
+        prefixes = [value for _, value in self.trie.prefixes_of('/foo/bar/qux')]
+
+        # Verify
+        self.assertEqual(['/', '/foo', '/foo/bar'], prefixes)
+
+    def test_with_prefix(self):
+        # Exercise
+        keys = sorted(key for key, _ in self.trie.with_prefix('/foo'))
+
+        # Verify
+        self.assertEqual(['/foo', '/foo/bar'], keys)
+
+
+class RouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = RouteData(id='root', paths=['/'])
+        self.users = RouteData(id='users', paths=['/users'])
+        self.users_by_id = RouteData(id='users-by-id', paths=[r'/users/\d+$'],
+                                     regex_priority=1)
+        self.users_post = RouteData(id='users-post', paths=['/users'], methods=['POST'])
+        self.example = RouteData(id='example', hosts=['example.com'], paths=['/users'])
+        self.wildcard = RouteData(id='wildcard', hosts=['*.example.com'])
+        self.secure = RouteData(id='secure', hosts=['secure.org'], protocols=['https'])
+        self.legacy = ApiData(name='legacy', upstream_url='http://legacy/',
+                              uris=['/legacy'])
+
+        self.router = Router(routes=[self.root, self.users, self.users_by_id,
+                                     self.users_post, self.example, self.wildcard,
+                                     self.secure],
+                             apis=[self.legacy])
+
+    def test_longest_prefix_wins(self):
+        self.assertIs(self.users, self.router.match('GET', 'foo.org', '/users/me'))
+        self.assertIs(self.root, self.router.match('GET', 'foo.org', '/other'))
+
+    def test_regex_path_wins_over_prefix(self):
+        self.assertIs(self.users_by_id, self.router.match('GET', 'foo.org', '/users/42'))
+
+    def test_more_attributes_win(self):
+        self.assertIs(self.users_post, self.router.match('POST', 'foo.org', '/users'))
+        self.assertIs(self.example, self.router.match('GET', 'example.com:8000', '/users'))
+
+    def test_wildcard_host(self):
+        self.assertIs(self.wildcard, self.router.match('GET', 'api.example.com', '/other'))
+
+    def test_protocol(self):
+        self.assertIs(self.secure, self.router.match('GET', 'secure.org', '/', 'https'))
+        self.assertIs(self.root, self.router.match('GET', 'secure.org', '/', 'http'))
+
+    def test_api_uris(self):
+        self.assertIs(self.legacy, self.router.match('GET', 'foo.org', '/legacy/v1'))
+
+    def test_matches_are_sorted_by_priority(self):
+        # Exercise
+        matches = self.router.matches('GET', 'foo.org', '/users/42')
+
+        # Verify
+        self.assertEqual(['users-by-id', 'users', 'root'],
+                         [match.entity.id for match in matches])
+
+    def test_backreferences_in_later_regex_paths(self):
+        # Setup
+        router = Router(routes=[RouteData(id='a', paths=[r'/(a)\1x']),
+                                RouteData(id='b', paths=[r'/(b)\1y']),
+                                RouteData(id='c', paths=[r'/(?P<c>c)(?P=c)z'])])
+
+        # Exercise & Verify
+        self.assertEqual('a', router.match('GET', 'h', '/aax').id)
+        self.assertEqual('b', router.match('GET', 'h', '/bby').id)
+        self.assertEqual('c', router.match('GET', 'h', '/ccz').id)
+        self.assertIsNone(router.match('GET', 'h', '/bcy'))
+
+    def test_no_match(self):
+        router = Router(routes=[self.users])
+
+        self.assertIsNone(router.match('GET', 'foo.org', '/other'))
+
+    def test_from_client(self):
+        # Setup
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.side_effect = [{'data': [{'id': 'users',
+                                                                'paths': ['/users']}]},
+                                                     {'data': []}]
+        client = KongAdminClient('http://kong.url/', session)
+
+        # Exercise
+        router = Router.from_client(client)
+
+        # Verify
+        self.assertEqual('users', router.match('GET', 'foo.org', '/users').id)
+
+
+class ConflictAnalyzerTest(unittest.TestCase):
+
+    def conflicts(self, *routes):
+        return [(conflict.kind, conflict.entity.id, [other.id for other in conflict.others])
+                for conflict in ConflictAnalyzer(routes=routes).conflicts()]
+
+    def test_literal_prefix(self):
+        self.assertEqual('/users/', literal_prefix(r'/users/\d+'))
+        self.assertEqual('/user', literal_prefix(r'/users?'))
+        self.assertEqual('', literal_prefix(r'^/users'))
+
+    def test_identical_routes_are_ambiguous(self):
+        # Setup
+        first = RouteData(id='first', hosts=['example.com'], paths=['/users'])
+        second = RouteData(id='second', hosts=['example.com'], paths=['/users'])
+
+        # Exercise & Verify
+        self.assertEqual([('ambiguous', 'first', ['second']),
+                          ('ambiguous', 'second', ['first'])],
+                         self.conflicts(first, second))
+
+    def test_regex_path_shadows_prefix_paths(self):
+        # Setup
+        regex = RouteData(id='regex', paths=[r'/users/\d+'])
+        shadowed = RouteData(id='shadowed', paths=['/users/42'])
+        reachable = RouteData(id='reachable', paths=['/users/me'])
+
+        # Exercise & Verify
+        self.assertEqual([('shadowed', 'shadowed', ['regex'])],
+                         self.conflicts(regex, shadowed, reachable))
+
+    def test_anchored_regex_only_overlaps_prefix_paths(self):
+        # Setup
+        prefix = RouteData(id='prefix', paths=['/users'])
+        anchored = RouteData(id='anchored', paths=['/users$'])
+        numbered = RouteData(id='numbered', paths=[r'/users/\d+\Z'])
+        below = RouteData(id='below', paths=['/users/42'])
+
+        # Exercise & Verify
+        self.assertEqual([('overlapping', 'prefix', ['anchored']),
+                          ('overlapping', 'below', ['numbered'])],
+                         self.conflicts(prefix, anchored, numbered, below))
+        router = Router(routes=[prefix, anchored])
+        self.assertEqual('prefix', router.match('GET', 'x', '/users/1').id)
+
+    def test_bounded_regexes(self):
+        self.assertTrue(is_bounded(r'/users/\d+$'))
+        self.assertTrue(is_bounded(r'/users\b'))
+        self.assertTrue(is_bounded(r'/users/(?!me)'))
+        self.assertFalse(is_bounded(r'/price/\$\d+'))
+        self.assertFalse(is_bounded(r'/users/\d+'))
+
+    def test_higher_regex_priority_shadows_identical_regex(self):
+        # Setup
+        low = RouteData(id='low', paths=[r'/users/\d+'], regex_priority=0)
+        high = RouteData(id='high', paths=[r'/users/\d+'], regex_priority=5)
+
+        # Exercise & Verify
+        self.assertEqual([('shadowed', 'low', ['high'])], self.conflicts(low, high))
+
+    def test_partially_covered_route_is_not_shadowed(self):
+        # Setup
+        get = RouteData(id='get', paths=['/users'], methods=['GET'])
+        get_and_post = RouteData(id='get-and-post', paths=['/users'], methods=['GET', 'POST'],
+                                 protocols=['http'])
+        longer = RouteData(id='longer', paths=['/users/me'], methods=['GET'])
+
+        # Exercise & Verify
+        self.assertEqual([('ambiguous', 'get', ['get-and-post']),
+                          ('ambiguous', 'get-and-post', ['get'])],
+                         self.conflicts(get, get_and_post, longer))
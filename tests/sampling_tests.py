@@ -0,0 +1,94 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.sampling import NodeStatusSampler, RingBuffer
+
+
+def status(total_requests, active=1, reachable=True):
+    return {'server': {'total_requests': total_requests, 'connections_active': active,
+                       'connections_accepted': 1, 'connections_handled': 1,
+                       'connections_reading': 0, 'connections_writing': 1,
+                       'connections_waiting': 0},
+            'database': {'reachable': reachable}}
+
+
+class NodeStatusSamplerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statuses = {'http://kong-1:8001/': [status(10 * tick, active=tick) for tick in
+                                                 range(6)],
+                         'http://kong-2:8001/': [status(5), status(2, reachable=False)]}
+        self.clients = []
+        for url, statuses in self.statuses.items():
+            session = MagicMock()
+            session.get.return_value.json.side_effect = statuses
+            self.clients.append(KongAdminClient(url, session))
+        self.now = [0.]
+
+    def clock(self):
+        self.now[0] += 2
+        return self.now[0]
+
+    def test_ring_buffer_keeps_last_samples(self):
+        # Setup
+        buffer = RingBuffer(3)
+
+        # Exercise
+        for tick in range(5):
+            buffer.append(tick, status(tick))
+
+        # Verify
+        times, values = buffer.series('total_requests')
+        self.assertEqual([2., 3., 4.], times.tolist())
+        self.assertEqual([2, 3, 4], values.tolist())
+
+    def test_rates_and_percentiles(self):
+        # Setup
+        sampler = NodeStatusSampler(self.clients, capacity=4, clock=self.clock)
+
+        # Exercise
+        for _ in range(6):
+            sampler.sample()
+
+        # Verify
+        node = 'http://kong-1:8001/'
+        self.assertEqual([5., 5., 5.], sampler.rates(node))
+        self.assertEqual({50: 3, 100: 5}, sampler.percentiles(node, 'connections_active',
+                                                              (50, 100)))
+        self.assertEqual([], sampler.rates('http://kong-2:8001/'))
+        self.assertEqual(4, sampler.errors['http://kong-2:8001/'])
+        self.assertEqual({50: None}, sampler.percentiles('http://kong-2:8001/',
+                                                         'total_requests', (50,)))
+
+    def test_export(self):
+        # Setup
+        sampler = NodeStatusSampler({'b': self.clients[1]}, clock=self.clock)
+        sampler.sample()
+        sampler.sample()
+
+        # Exercise
+        exported = json.loads(json.dumps(sampler.export()))
+
+        # Verify
+        self.assertEqual([2., 4.], exported['b']['time'])
+        self.assertEqual([1, 0], exported['b']['database_reachable'])
+        self.assertRaisesRegex(KeyError, 'unknown field', lambda: sampler.series('b', 'x'))
+
+    def test_run_until_stopped(self):
+        # Setup
+        def sleep(seconds):
+            self.assertLessEqual(seconds, 1.)
+            if sampler.buffers['http://kong-1:8001/'].count == 3:
+                sampler.stop()
+
+        sampler = NodeStatusSampler(self.clients[:1], interval=1., sleep=sleep,
+                                    clock=self.clock)
+
+        # Exercise
+        sampler.start()
+        sampler._thread.join(5)  # pylint: disable=protected-access
+
+        # Verify
+        self.assertEqual(3, sampler.buffers['http://kong-1:8001/'].count)
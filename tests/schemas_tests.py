@@ -0,0 +1,138 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.exceptions import SchemaViolation
+from kong.kong_clients import KongAdminClient
+from kong.schemas import PluginSchemaRegistry, compile_schema
+
+
+RATE_LIMITING_SCHEMA = {
+    "fields": {
+        "minute": {"type": "number"},
+        "policy": {"type": "string", "enum": ["local", "cluster", "redis"],
+                   "default": "cluster"},
+        "limit_by": {"type": "string", "required": True},
+        "methods": {"type": "array", "enum": ["GET", "POST"]},
+        "redis": {"type": "table",
+                  "schema": {"fields": {"host": {"type": "string", "required": True},
+                                        "port": {"type": "number"}}}},
+    }
+}
+
+
+class CompileSchemaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.validate = compile_schema(RATE_LIMITING_SCHEMA)
+
+    def test_valid_config(self):
+        self.assertEqual([], self.validate({'minute': '20', 'limit_by': 'consumer',
+                                            'methods': 'GET,POST',
+                                            'redis': {'host': 'redis', 'port': 6379}}))
+
+    def test_reports_every_violation(self):
+        # Exercise
+        errors = self.validate({'minute': 'often', 'policy': 'global',
+                                'methods': ['PUT'], 'redis': {'port': 6379}, 'foo': 1})
+
+        # Verify
+        self.assertEqual(sorted(['limit_by: required field missing',
+                                 'minute: expected a number',
+                                 'policy: "global" is not allowed',
+                                 'methods: "PUT" is not allowed',
+                                 'redis.host: required field missing',
+                                 'foo: unknown field']),
+                         sorted(errors))
+
+    def test_partial_config_skips_required_fields(self):
+        self.assertEqual([], self.validate({'minute': 5}, partial=True))
+
+
+class PluginSchemaRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.kong_url = 'http://kong.url/'
+        self.session = MagicMock()
+        self.session.get.return_value.status_code = 200
+        self.session.post.return_value.status_code = 201
+        self.responses = {
+            self.kong_url: {'version': '0.13.1'},
+            self.kong_url + 'plugins/schema/rate-limiting': RATE_LIMITING_SCHEMA,
+        }
+        self.session.get.side_effect = self.get
+
+        self.registry = PluginSchemaRegistry(KongAdminClient(self.kong_url, self.session))
+        self.client = KongAdminClient(self.kong_url, self.session, schema_registry=self.registry)
+
+    def get(self, url, **kwargs):  # pylint:disable=unused-argument
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = self.responses[url]
+        return response
+
+    def test_schema_is_fetched_once(self):
+        # Exercise
+        for _ in range(3):
+            self.registry.validate('rate-limiting', {'limit_by': 'ip'})
+
+        # Verify
+        self.assertEqual(2, self.session.get.call_count)
+
+    def test_new_version_drops_cached_schemas(self):
+        # Setup
+        self.registry.validate('rate-limiting', {'limit_by': 'ip'})
+        self.responses[self.kong_url] = {'version': '0.14.0'}
+
+        # Exercise
+        self.registry.refresh_version()
+        self.registry.validate('rate-limiting', {'limit_by': 'ip'})
+
+        # Verify
+        self.assertEqual(4, self.session.get.call_count)
+
+    def test_create_w_invalid_config_is_not_sent(self):
+        # Verify
+        self.assertRaisesRegex(SchemaViolation, 'limit_by',
+                               lambda: self.client.plugins.create(name='rate-limiting',
+                                                                  config={'minute': 5}))
+        self.session.post.assert_not_called()
+
+    def test_create_w_valid_config_is_sent(self):
+        # Setup
+        self.session.post.return_value.json.return_value = {'id': 'id', 'name': 'rate-limiting'}
+
+        # Exercise
+        self.client.plugins.create(name='rate-limiting', config={'limit_by': 'ip'})
+
+        # Verify
+        self.session.post.assert_called_once_with(self.kong_url + 'plugins/',
+                                                  json={'name': 'rate-limiting',
+                                                        'config.limit_by': 'ip'})
+
+    def test_update_w_invalid_config_is_not_sent(self):
+        # Setup
+        plugin = {'id': 'plugin-id', 'name': 'rate-limiting'}
+        self.responses[self.kong_url + 'plugins/plugin-id'] = plugin
+
+        # Verify
+        self.assertRaisesRegex(SchemaViolation, 'policy',
+                               lambda: self.client.plugins.update('plugin-id',
+                                                                  config={'policy': 'global'}))
+        self.session.patch.assert_not_called()
+
+    def test_update_w_valid_partial_config_is_sent(self):
+        # Setup
+        plugin = {'id': 'plugin-id', 'name': 'rate-limiting'}
+        self.responses[self.kong_url + 'plugins/plugin-id'] = plugin
+        self.session.patch.return_value.status_code = 200
+        self.session.patch.return_value.json.return_value = plugin
+
+        # Exercise
+        self.client.plugins.update('plugin-id', config={'minute': 5})
+
+        # Verify
+        self.session.patch.assert_called_once_with(self.kong_url + 'plugins/plugin-id',
+                                                   json={'config.minute': 5})
+
+    def test_dry_run_keeps_the_registry(self):
+        self.assertIs(self.registry, self.client.dry_run().plugins.schema_registry)
@@ -0,0 +1,188 @@
+import importlib.util
+import multiprocessing
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.shared_cache import SharedMemoryCache
+
+HAS_SHARED_MEMORY = importlib.util.find_spec('multiprocessing.shared_memory') is not None
+
+
+def _worker(cache, results):
+    results.put(cache.get('http://kong.url/services/billing'))
+    cache.set('http://kong.url/services/search', {'id': '2', 'name': 'search'})
+
+
+@unittest.skipIf(not HAS_SHARED_MEMORY, 'multiprocessing.shared_memory needs python 3.8')
+class SharedMemoryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SharedMemoryCache(slots=256, slot_size=256, stripes=4)
+
+    def tearDown(self):
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_set_get_delete(self):
+        # Exercise
+        self.cache.set('a', {'id': '1'})
+        self.cache.set('b', [1, 2])
+        self.cache.set('a', {'id': '3'})
+
+        # Verify
+        self.assertEqual({'id': '3'}, self.cache.get('a'))
+        self.assertEqual([1, 2], self.cache.get('b'))
+        self.cache.delete('a')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual([1, 2], self.cache.get('b'))
+
+    def test_values_larger_than_a_slot_are_not_cached(self):
+        # Verify
+        self.assertFalse(self.cache.set('big', 'x' * 1000))
+        self.assertIsNone(self.cache.get('big'))
+
+    def test_expired_values_are_misses(self):
+        # Exercise
+        self.cache.set('a', 1, ttl=-1)
+
+        # Verify
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_full_table_keeps_working(self):
+        # Exercise
+        for number in range(1000):
+            self.cache.set('key-%d' % number, number)
+
+        # Verify
+        self.assertEqual(999, self.cache.get('key-999'))
+
+    @unittest.skipIf('fork' not in multiprocessing.get_all_start_methods(), 'needs fork')
+    def test_forked_workers_share_entries(self):
+        # Setup
+        self.cache.set('http://kong.url/services/billing', {'id': '1', 'name': 'billing'})
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+
+        # Exercise
+        worker = context.Process(target=_worker, args=(self.cache, results))
+        worker.start()
+        worker.join(10)
+
+        # Verify
+        self.assertEqual({'id': '1', 'name': 'billing'}, results.get(timeout=1))
+        self.assertEqual({'id': '2', 'name': 'search'},
+                         self.cache.get('http://kong.url/services/search'))
+
+    def test_client_retrieve_path(self):
+        # Setup
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {'data': [
+            {'id': '1', 'name': 'billing', 'host': 'billing', 'protocol': 'http'}]}
+        session.delete.return_value.status_code = 204
+        client = KongAdminClient('http://kong.url/', session, cache=self.cache)
+        self.cache.warm(client.services)
+        session.get.reset_mock()
+
+        # Exercise
+        by_name = client.services.retrieve('billing')
+        by_id = client.services.retrieve('1')
+        client.services.delete('billing')
+
+        # Verify
+        self.assertEqual(by_name, by_id)
+        session.get.assert_not_called()
+        self.assertIsNone(self.cache.get('http://kong.url/services/billing'))
+
+    def _client(self, updated=None):
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {'data': [
+            {'id': 'abc', 'name': 'billing', 'host': 'billing', 'protocol': 'http'}]}
+        session.patch.return_value.status_code = 200
+        session.patch.return_value.json.return_value = updated
+        session.delete.return_value.status_code = 204
+        client = KongAdminClient('http://kong.url/', session, cache=self.cache)
+        self.cache.warm(client.services)
+        return client
+
+    def test_update_by_name_evicts_the_id_alias(self):
+        # Setup
+        updated = {'id': 'abc', 'name': 'billing', 'host': 'new', 'protocol': 'http'}
+        client = self._client(updated)
+
+        # Exercise
+        client.services.update('billing', host='new')
+
+        # Verify
+        self.assertEqual('new', client.services.retrieve('abc').host)
+
+    def test_rename_evicts_the_old_name(self):
+        # Setup
+        updated = {'id': 'abc', 'name': 'invoicing', 'host': 'billing', 'protocol': 'http'}
+        client = self._client(updated)
+
+        # Exercise
+        client.services.update('abc', name='invoicing')
+
+        # Verify
+        self.assertIsNone(self.cache.get('http://kong.url/services/billing'))
+        self.assertEqual(updated, self.cache.get('http://kong.url/services/invoicing'))
+
+    def test_delete_by_id_evicts_the_name_alias(self):
+        # Setup
+        client = self._client()
+
+        # Exercise
+        client.services.delete('abc')
+
+        # Verify
+        self.assertIsNone(self.cache.get('http://kong.url/services/billing'))
+        self.assertIsNone(self.cache.get('http://kong.url/services/abc'))
+
+    def test_retrieve_caches_every_alias(self):
+        # Setup
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {
+            'id': 'abc', 'name': 'billing', 'host': 'billing', 'protocol': 'http'}
+        session.delete.return_value.status_code = 204
+        client = KongAdminClient('http://kong.url/', session, cache=self.cache)
+        client.services.retrieve('billing')
+
+        # Exercise
+        client.services.delete('abc')
+
+        # Verify
+        self.assertIsNone(self.cache.get('http://kong.url/services/billing'))
+
+    def test_plugins_are_not_cached_by_type_name(self):
+        # Setup
+        plugin = {'id': 'p1', 'name': 'key-auth', 'config': {}}
+        session = MagicMock()
+        session.get.side_effect = lambda url, **kwargs: MagicMock(
+            status_code=200 if url.endswith('/p1') else 404,
+            content='Not found', json=MagicMock(return_value=plugin))
+        client = KongAdminClient('http://kong.url/', session, cache=self.cache)
+        client.plugins.retrieve('p1')
+
+        # Verify
+        self.assertRaises(NameError, lambda: client.plugins.retrieve('key-auth'))
+        self.assertEqual(2, session.get.call_count)
+
+    def test_api_plugin_delete_evicts_the_plugin(self):
+        # Setup
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {'id': 'p1', 'name': 'key-auth'}
+        session.delete.return_value.status_code = 204
+        client = KongAdminClient('http://kong.url/', session, cache=self.cache)
+        client.plugins.retrieve('p1')
+
+        # Exercise
+        client.plugins.delete('p1', api_pk='billing')
+
+        # Verify
+        session.delete.assert_called_once_with('http://kong.url/apis/billing/plugins/p1')
+        self.assertIsNone(self.cache.get('http://kong.url/plugins/p1'))
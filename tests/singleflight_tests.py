@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for_waiters(flight, count):
+    # pylint:disable=protected-access
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flight._lock:
+            if sum(call.waiters for call in flight._calls.values()) == count:
+                return
+        time.sleep(0.001)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def slow(self):
+        self.calls += 1
+        self.release.wait(5)
+        return {'data': [1, 2, 3]}
+
+    def run_concurrently(self, function, count=8):
+        with ThreadPoolExecutor(count) as pool:
+            futures = [pool.submit(function) for _ in range(count)]
+            wait_for_waiters(self.flight, count - 1)
+            self.release.set()
+            return [future.result() for future in futures]
+
+    def test_concurrent_calls_share_one_execution(self):
+        # Exercise
+        results = self.run_concurrently(lambda: self.flight.do('key', self.slow))
+
+        # Verify
+        self.assertEqual(1, self.calls)
+        self.assertEqual([{'data': [1, 2, 3]}] * 8, results)
+        self.assertEqual(8, len({id(result) for result in results}))
+
+    def test_errors_are_shared(self):
+        # Setup
+        def failing():
+            self.slow()
+            raise NameError('not found')
+
+        def call():
+            try:
+                return self.flight.do('key', failing)
+            except NameError as error:
+                return str(error)
+
+        # Exercise
+        results = self.run_concurrently(call)
+
+        # Verify
+        self.assertEqual(['not found'] * 8, results)
+        self.assertEqual(1, self.calls)
+
+    def test_sequential_calls_are_not_shared(self):
+        # Setup
+        self.release.set()
+
+        # Exercise
+        self.flight.do('key', self.slow)
+        self.flight.do('key', self.slow)
+
+        # Verify
+        self.assertEqual(2, self.calls)
+        self.assertEqual(0, self.flight.in_flight())
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_coroutines_share_one_execution(self):
+        # Setup
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'enabled_plugins': ['cors']}
+
+        async def main():
+            return await asyncio.gather(*[flight.do('key', fetch) for _ in range(5)])
+
+        # Exercise
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(main())
+        finally:
+            loop.close()
+
+        # Verify
+        self.assertEqual(1, len(calls))
+        self.assertEqual([{'enabled_plugins': ['cors']}] * 5, results)
+        self.assertEqual(0, flight.in_flight())
+
+
+class ClientSingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.session = MagicMock()
+        self.session.get.side_effect = self.get
+        self.client = KongAdminClient('http://kong.url/', self.session,
+                                      singleflight=SingleFlight())
+
+    def get(self, url, **kwargs):  # pylint:disable=unused-argument
+        self.release.wait(5)
+        response = MagicMock()
+        response.status_code = 200
+        if url.endswith('/health/'):
+            response.json.return_value = {'data': [{'target': '10.0.0.1:80'}]}
+        elif 'params' in kwargs:
+            response.json.return_value = {'data': [{'id': '1', 'username': 'alice'},
+                                                   {'id': '2', 'username': 'bob'}]}
+        else:
+            response.json.return_value = {'id': '1', 'name': 'billing', 'host': 'billing',
+                                          'protocol': 'http', 'port': 80, 'path': '/'}
+        return response
+
+    def run_concurrently(self, function, count=8):
+        with ThreadPoolExecutor(count) as pool:
+            futures = [pool.submit(function) for _ in range(count)]
+            wait_for_waiters(self.client.singleflight, count - 1)
+            self.release.set()
+            return [future.result() for future in futures]
+
+    def test_concurrent_retrieves_share_one_request(self):
+        # Exercise
+        services = self.run_concurrently(lambda: self.client.services.retrieve('billing'))
+
+        # Verify
+        self.assertEqual(['billing'] * 8, [service.name for service in services])
+        self.session.get.assert_called_once_with('http://kong.url/services/billing')
+
+    def test_concurrent_health_checks_share_one_request(self):
+        # Exercise
+        self.run_concurrently(lambda: self.client.upstreams.health_status('billing-up'))
+
+        # Verify
+        self.assertEqual(1, self.session.get.call_count)
+
+    def test_concurrent_listings_each_get_every_element(self):
+        # Exercise
+        listings = self.run_concurrently(lambda: list(self.client.consumers.list()))
+
+        # Verify
+        self.assertEqual(1, self.session.get.call_count)
+        for consumers in listings:
+            self.assertEqual({'alice', 'bob'}, {consumer.username for consumer in consumers})
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from kong.kong_clients import KongAdminClient
+from kong.snapshots import Snapshot, write_snapshot
+
+
+def consumers(count):
+    return [{'id': 'id-%05d' % number, 'username': 'user-%05d' % number,
+             'created_at': number} for number in range(count)]
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'consumers.snapshot')
+        self.consumers = consumers(1000)
+        # written out of key order, the indexes sort them
+        write_snapshot(self.path, reversed(self.consumers))
+        self.snapshot = Snapshot(self.path)
+
+    def tearDown(self):
+        self.snapshot.close()
+        shutil.rmtree(self.directory)
+
+    def test_lookup_by_key(self):
+        self.assertEqual(1000, len(self.snapshot))
+        self.assertEqual(self.consumers[42], self.snapshot.get('id', 'id-00042'))
+        self.assertEqual(self.consumers[999], self.snapshot.get('username', 'user-00999'))
+        self.assertEqual(self.consumers[0], self.snapshot.get('username', 'user-00000'))
+        self.assertIsNone(self.snapshot.get('username', 'user-01000'))
+        self.assertIsNone(self.snapshot.get('name', 'anything'))
+
+    def test_range(self):
+        # Exercise
+        found = list(self.snapshot.range('username', 'user-00010', 'user-00013'))
+
+        # Verify
+        self.assertEqual(self.consumers[10:13], found)
+        self.assertEqual(1000, len(list(self.snapshot.range('id'))))
+
+    def test_records_by_position(self):
+        self.assertEqual(self.consumers[-1], self.snapshot[0])
+        self.assertRaises(IndexError, lambda: self.snapshot[1000])
+
+    def test_unknown_field(self):
+        # Verify
+        self.assertRaisesRegex(KeyError, 'not indexed: host',
+                               lambda: self.snapshot.get('host', 'a'))
+
+    def test_invalid_file(self):
+        # Setup
+        path = os.path.join(self.directory, 'other')
+        with open(path, 'wb') as other:
+            other.write(b'{"data": []}')
+
+        # Verify
+        self.assertRaisesRegex(ValueError, 'invalid snapshot', lambda: Snapshot(path))
+
+    def test_client_snapshot(self):
+        # Setup
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {'data': consumers(3)}
+        client = KongAdminClient('http://kong.url/', session)
+        path = os.path.join(self.directory, 'client.snapshot')
+
+        # Exercise
+        count = client.consumers.snapshot(path)
+
+        # Verify
+        self.assertEqual(3, count)
+        with Snapshot(path) as snapshot:
+            self.assertEqual('id-00001', snapshot.get('username', 'user-00001')['id'])
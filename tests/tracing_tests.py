@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from kong.kong_clients import KongAdminClient
+from kong.tracing import Tracer, InMemoryCollector, FileExporter
+
+
+class TracingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.kong_url = 'http://kong.url/'
+        self.session = MagicMock()
+        self.collector = InMemoryCollector()
+        self.client = KongAdminClient(self.kong_url, self.session,
+                                      tracer=Tracer(self.collector))
+
+        self.service_id = "4e13f54a-bbf1-47a8-8777-255fed7116f2"
+        self.route_json = {"id": "22108377-8f26-4c0e-bd9e-2962c1d6b0e6",
+                           "hosts": ["example.com"],
+                           "service": {"id": self.service_id}}
+
+    def test_retrieve_opens_parent_and_http_spans(self):
+        # Setup
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.return_value = {'id': 'foo', 'username': 'foo'}
+
+        # Exercise
+        self.client.consumers.retrieve('foo')
+
+        # Verify
+        parent, = self.collector.find('ConsumerAdminClient.retrieve')
+        http, = self.collector.children_of(parent)
+        self.assertEqual('HTTP GET', http.name)
+        self.assertEqual(self.kong_url + 'consumers/foo', http.attributes['url'])
+        self.assertEqual(200, http.attributes['status_code'])
+        self.assertEqual(parent.trace_id, http.trace_id)
+
+    def test_paginated_list_opens_span_per_page(self):
+        # Setup
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.side_effect = [
+            {'data': [self.route_json, self.route_json], 'offset': 'next'},
+            {'data': [self.route_json]}
+        ]
+
+        # Exercise
+        routes = list(self.client.routes.list_associated_to_service(self.service_id, size=2))
+
+        # Verify
+        self.assertEqual(3, len(routes))
+        parent, = self.collector.find('RouteAdminClient.list_associated_to_service')
+        pages = self.collector.children_of(parent)
+        self.assertEqual([None, 'next'], [page.attributes['offset'] for page in pages])
+        self.assertEqual([2, 1], [page.attributes['count'] for page in pages])
+        self.assertEqual(2, parent.attributes['pages'])
+        self.assertEqual(3, parent.attributes['count'])
+        for page in pages:
+            self.assertEqual(['HTTP GET'],
+                             [http.name for http in self.collector.children_of(page)])
+
+    def test_unconsumed_listing_exports_no_span(self):
+        # Setup
+        self.session.get.return_value.status_code = 200
+        self.session.get.return_value.json.return_value = {'data': [self.route_json]}
+        tracer = self.client.routes.tracer
+
+        # Exercise
+        with patch.object(tracer, 'start_span', wraps=tracer.start_span) as start_span:
+            routes = self.client.routes.list()
+            started = start_span.call_count
+            exported = list(self.collector.spans)
+            listed = list(routes)
+
+        # Verify
+        self.assertEqual(0, started)
+        self.assertEqual([], exported)
+        self.assertEqual(1, len(listed))
+        span, = self.collector.find('RouteAdminClient.list')
+        self.assertEqual(1, span.attributes['count'])
+
+    def test_failed_request_records_error(self):
+        # Setup
+        self.session.delete.return_value.status_code = 404
+        self.session.delete.return_value.content = 'Not found'
+
+        # Exercise
+        with self.assertRaises(NameError):
+            self.client.services.delete('billing')
+
+        # Verify
+        span, = self.collector.find('ServiceAdminClient.delete')
+        self.assertRegex(span.error, 'NameError')
+
+    def test_file_exporter_writes_json_lines(self):
+        # Setup
+        path = os.path.join(tempfile.mkdtemp(), 'spans.jsonl')
+        exporter = FileExporter(path)
+        tracer = Tracer(exporter)
+
+        # Exercise
+        with tracer.span('parent'):
+            with tracer.span('child', offset=10):
+                pass
+        exporter.close()
+
+        # Verify
+        with open(path) as spans_file:
+            child, parent = [json.loads(line) for line in spans_file]
+        self.assertEqual(parent['span_id'], child['parent_id'])
+        self.assertEqual({'offset': 10}, child['attributes'])
@@ -0,0 +1,109 @@
+import unittest
+
+from kong.structures import ApiData, ConsumerData, ServiceData, UpstreamData
+from kong.validation import _ABSENT, validate_batch, validate_state, to_columns
+
+
+class ValidateBatchTest(unittest.TestCase):
+
+    def report(self, violations):
+        return [(violation.row, str(violation.error)) for violation in violations]
+
+    def test_to_columns(self):
+        # Exercise
+        columns, length = to_columns([{'name': 'a'}, {'slots': 10}])
+
+        # Verify
+        self.assertEqual(2, length)
+        self.assertEqual({'name': ['a', _ABSENT], 'slots': [_ABSENT, 10]}, columns)
+
+    def test_columnar_batch(self):
+        # Setup
+        upstreams = {'name': ['a', None, 'c', 'd'],
+                     'hash_on': ['none', 'ip', 'header', 'HEADER'],
+                     'hash_on_header': [None, None, 'x-user', None],
+                     'foo': [None, None, 'bar', None]}
+
+        # Exercise
+        violations = validate_batch(UpstreamData, upstreams)
+
+        # Verify
+        self.assertEqual([(1, 'name must be provided to _perform_create'),
+                          (2, 'invalid parameter: foo'),
+                          (3, 'hash_on_header required when hash_on is set to header')],
+                         self.report(violations))
+
+    def test_columns_of_different_length(self):
+        self.assertRaises(ValueError,
+                          lambda: validate_batch(UpstreamData, {'name': ['a'], 'slots': []}))
+
+    def test_service_url_forms(self):
+        # Setup
+        services = [{'name': 'ok', 'url': 'http://example.org/path'},
+                    {'name': 'ok-too', 'protocol': 'http', 'host': 'example.org'},
+                    {'url': 'http://example.org/', 'port': 8080},
+                    {'protocol': 'http'},
+                    {'url': 'example'}]
+
+        # Exercise
+        violations = validate_batch(ServiceData, services)
+
+        # Verify
+        self.assertEqual([(2, 'port: got multiple values'),
+                          (3, 'host: required field missing'),
+                          (4, 'url: invalid url example')],
+                         self.report(violations))
+
+    def test_matches_record_validation(self):
+        # Setup
+        upstreams = [{'name': 'a', 'hash_fallback': 'header'}, {'slots': object()}]
+
+        # Exercise
+        batch = validate_batch(UpstreamData, upstreams)
+        records = UpstreamData.validate_many(upstreams)
+
+        # Verify
+        self.assertEqual(sorted(self.report(records)), sorted(self.report(batch)))
+
+    def test_none_fields_are_present(self):
+        # Setup
+        batches = [(UpstreamData, [{'name': None}]),
+                   (ApiData, [{'name': 'a', 'upstream_url': 'http://example.org/',
+                               'hosts': None},
+                              {'name': 'b', 'upstream_url': 'http://example.org/'}]),
+                   (ServiceData, [{'url': None}, {'url': None, 'port': None}])]
+
+        for object_data_class, records in batches:
+            # Exercise
+            batch = validate_batch(object_data_class, records)
+            expected = object_data_class.validate_many(records)
+
+            # Verify
+            self.assertEqual(self.report(expected), self.report(batch))
+
+    def test_unknown_fields_set_to_none(self):
+        # Setup
+        consumers = [{'username': 'a', 'bogus': None}, {'username': 'b'}]
+
+        # Exercise
+        batch = validate_batch(ConsumerData, consumers)
+
+        # Verify
+        self.assertEqual([(0, 'invalid parameter: bogus')], self.report(batch))
+        self.assertEqual(self.report(ConsumerData.validate_many(consumers)), self.report(batch))
+
+    def test_validate_state(self):
+        # Setup
+        state = {'services': [{'url': 'http://example.org/'}],
+                 'routes': [{'paths': ['/']}, {'strip_path': True}]}
+
+        # Exercise
+        report = validate_state(state)
+
+        # Verify
+        self.assertEqual(['routes'], list(report))
+        self.assertEqual([1], [violation.row for violation in report['routes']])
+
+    def test_validate_state_w_unknown_collection(self):
+        self.assertRaisesRegex(KeyError, 'certificates',
+                               lambda: validate_state({'certificates': []}))
@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kong.fingerprints import fingerprint
+from kong.kong_clients import KongAdminClient
+from kong.watch import ADDED, CHANGED, REMOVED, Event
+
+
+class FingerprintTest(unittest.TestCase):
+
+    def test_key_order_does_not_matter(self):
+        self.assertEqual(fingerprint({'id': '1', 'name': 'a', 'config': {'x': 1, 'y': 2}}),
+                         fingerprint({'config': {'y': 2, 'x': 1}, 'name': 'a', 'id': '1'}))
+
+    def test_content_matters(self):
+        self.assertNotEqual(fingerprint({'id': '1', 'name': 'a'}),
+                            fingerprint({'id': '1', 'name': 'b'}))
+
+    def test_excluded_fields(self):
+        self.assertEqual(fingerprint({'id': '1', 'updated_at': 1}, exclude=('updated_at',)),
+                         fingerprint({'id': '1', 'updated_at': 2}, exclude=('updated_at',)))
+
+
+class WatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.kong_url = 'http://kong.url/'
+        self.session = MagicMock()
+        self.session.get.side_effect = self.get
+        self.consumers = [{'id': '1', 'username': 'alice'}, {'id': '2', 'username': 'bob'}]
+        self.client = KongAdminClient(self.kong_url, self.session)
+        self.sleeps = []
+
+    def get(self, url, **kwargs):  # pylint:disable=unused-argument
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {'data': [dict(consumer) for consumer in self.consumers]}
+        return response
+
+    def test_baseline_emits_nothing(self):
+        # Setup
+        watcher = self.client.watch(['consumers'])
+
+        # Exercise
+        events = watcher.poll()
+
+        # Verify
+        self.assertEqual([], events)
+        self.assertEqual(2, len(watcher))
+
+    def test_baseline_w_emit_initial(self):
+        # Setup
+        watcher = self.client.watch(['consumers'], emit_initial=True)
+
+        # Exercise
+        events = watcher.poll()
+
+        # Verify
+        self.assertEqual({'1', '2'}, {event.id for event in events})
+        self.assertTrue(all(event.kind == ADDED for event in events))
+
+    def test_diff_events(self):
+        # Setup
+        watcher = self.client.watch(['consumers'])
+        watcher.poll()
+        self.consumers = [{'id': '1', 'username': 'alice', 'custom_id': 'x'},
+                          {'id': '3', 'username': 'carol'}]
+
+        # Exercise
+        events = watcher.poll()
+
+        # Verify
+        self.assertEqual(sorted([Event(CHANGED, 'consumers', '1', self.consumers[0]),
+                                 Event(ADDED, 'consumers', '3', self.consumers[1]),
+                                 Event(REMOVED, 'consumers', '2', None)]),
+                         sorted(events))
+        self.assertEqual([], watcher.poll())
+
+    def test_interval_adapts(self):
+        # Setup
+        added = [{'id': '3', 'username': 'carol'}, {'id': '4', 'username': 'dave'}]
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            if added:
+                self.consumers.append(added.pop(0))
+            else:
+                watcher.stop()
+
+        watcher = self.client.watch(['consumers'], interval=10, min_interval=5,
+                                    max_interval=20, sleep=sleep)
+
+        # Exercise
+        events = list(watcher)
+
+        # Verify
+        self.assertEqual(['3', '4'], [event.id for event in events])
+        self.assertEqual([15, 7.5, 5], [round(seconds, 1) for seconds in self.sleeps])
+
+    def test_invalid_entity_type(self):
+        # Verify
+        self.assertRaisesRegex(KeyError, 'invalid entity type: targets',
+                               lambda: self.client.watch(['targets']))